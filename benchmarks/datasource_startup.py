@@ -0,0 +1,89 @@
+"""
+Startup benchmark for the datasource client.
+
+Serves generated CSV payloads for every endpoint listed in
+`custom_configs.yaml` from the local stand-in of the coronacidades API in
+`tests/datasource_server.py` (with ETag/Last-Modified support and an
+artificial latency), then compares the serial `pd.read_csv(url)`
+downloads used by the notebooks with the pooled, concurrent and cached
+`DataSourceClient`.
+
+Usage:
+    python benchmarks/datasource_startup.py --latency 0.2 --rows 50000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from simulacovid.datasource import DataSourceClient, endpoint_path  # noqa: E402
+from tests.datasource_server import stand_in_server  # noqa: E402
+
+
+def endpoint_names(endpoints, prefix=""):
+    for key, value in endpoints.items():
+        if isinstance(value, dict):
+            yield from endpoint_names(value, f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}"
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    fn()
+    print(f"{label:<32}{time.perf_counter() - start:8.2f} s")
+
+
+def main(args):
+    with open(ROOT / "custom_configs.yaml", "r") as f:
+        config = yaml.load(f, Loader=yaml.FullLoader)
+
+    rng = np.random.default_rng(0)
+    payload = pd.DataFrame({
+        "state_num_id": rng.integers(11, 53, args.rows),
+        "last_updated": pd.Timestamp("2020-12-01")
+        + pd.to_timedelta(rng.integers(0, 300, args.rows), unit="D"),
+        "active_cases": rng.random(args.rows) * 1000,
+    }).to_csv(index=False).encode()
+
+    server = stand_in_server(payload, args.latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    endpoints = list(endpoint_names(config["br"]["api"]["endpoints"]))
+    print(f"{len(endpoints)} endpoints, {len(payload) / 1e6:.1f} MB each\n")
+
+    urls = [
+        f"{base_url}/{endpoint_path(config['br']['api']['endpoints'], endpoint)}"
+        for endpoint in endpoints
+    ]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        timed("serial pd.read_csv", lambda: [pd.read_csv(url) for url in urls])
+
+        client = DataSourceClient(config, base_url=base_url, cache_dir=cache_dir)
+        timed("client, cold cache", lambda: client.fetch_many(endpoints))
+
+        client.refresh_rate = 0  # force conditional requests
+        timed("client, revalidated (304)", lambda: client.fetch_many(endpoints))
+
+        client.refresh_rate = config["refresh_rate"] * 60
+        timed("client, fresh cache", lambda: client.fetch_many(endpoints))
+        client.close()
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--latency", type=float, default=0.2,
+                        help="seconds the stand-in server waits per request")
+    parser.add_argument("--rows", type=int, default=50000,
+                        help="rows in each generated payload")
+    main(parser.parse_args())
@@ -0,0 +1,72 @@
+"""
+Startup benchmark for the `simulacovid` command line interface.
+
+Measures, in fresh interpreters, the wall time to print the CLI help and to
+load the configuration with a cold and a warm cache, and checks that these
+short paths do not import the heavy scientific dependencies.
+
+Usage:
+    python benchmarks/import_time.py --repeat 5
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY_MODULES = ["pandas", "numpy", "scipy", "yaml"]
+
+CASES = {
+    "interpreter only": "pass",
+    "cli --help": (
+        "from simulacovid import cli\n"
+        "try: cli.main(['--help'])\n"
+        "except SystemExit: pass"
+    ),
+    # the first load parses the YAML file and fills the cache
+    "config, cold cache": (
+        "from simulacovid.configuration import load_config\n"
+        f"load_config({str(ROOT / 'custom_configs.yaml')!r})"
+    ),
+    "config, warm cache": (
+        "from simulacovid.configuration import load_config\n"
+        f"load_config({str(ROOT / 'custom_configs.yaml')!r})"
+    ),
+}
+
+REPORT_IMPORTS = (
+    "\nimport sys\n"
+    f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules), "
+    "file=sys.stderr)"
+)
+
+
+def run(code, env):
+    start = time.perf_counter()
+    imported = subprocess.run(
+        [sys.executable, "-c", code + REPORT_IMPORTS],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+    ).stderr
+    return time.perf_counter() - start, imported.strip()
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = {"XDG_CACHE_HOME": cache_dir, "PATH": ""}
+        for label, code in CASES.items():
+            repeat = 1 if "cold" in label else args.repeat
+            timings = [run(code, env) for _ in range(repeat)]
+            elapsed = statistics.median(timing for timing, _ in timings)
+            imported = timings[-1][1] or "-"
+            print(f"{label:<24}{elapsed * 1000:8.1f} ms   heavy imports: {imported}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,140 @@
+"""
+Load test for the asynchronous projection service.
+
+Starts a `ProjectionService` on a local port, with the Farol history in
+`data/` and place-specific parameters derived from `custom_configs.yaml`,
+and fires concurrent keep-alive clients against it. Reports latency
+percentiles and throughput.
+
+Usage:
+    python benchmarks/loadtest.py --requests 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from simulacovid.service import ProjectionService  # noqa: E402
+
+
+def load_service(args):
+    with open(ROOT / "custom_configs.yaml", "r") as f:
+        config = yaml.load(f, Loader=yaml.FullLoader)
+
+    farol = pd.read_csv(ROOT / "data" / "br-states-farolcovid-history.csv")
+    farol = farol.dropna(subset=["notification_rate", "rt_most_likely"])
+
+    # same severity distribution for every state, taken from the config; the
+    # fatality ratio must stay below the proportion of critical cases
+    disease_params = config["br"]["seir_parameters"]
+    place_specific_params = pd.DataFrame(
+        {
+            param: disease_params[param]
+            for param in [
+                "i0_percentage",
+                "i1_percentage",
+                "i2_percentage",
+                "i3_percentage",
+            ]
+        },
+        index=pd.Index(farol["state_id"].unique(), name="state_id"),
+    )
+    place_specific_params["fatality_ratio"] = (
+        0.5 * place_specific_params["i3_percentage"]
+    )
+
+    return ProjectionService(
+        config,
+        farol,
+        place_specific_params,
+        place_id="state_id",
+        executor=ProcessPoolExecutor(
+            args.workers, mp_context=multiprocessing.get_context("spawn")
+        ),
+        cache_ttl=0 if args.no_cache else 300,
+    )
+
+
+async def client(port, targets, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for target in targets:
+        start = time.perf_counter()
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        await writer.drain()
+        await reader.readline()
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line == b"\r\n":
+                break
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def main(args):
+    service = load_service(args)
+    server = await service.serve(port=0)
+    port = server.sockets[0].getsockname()[1]
+
+    rng = np.random.default_rng(args.seed)
+    places = service.rows.index.to_numpy()
+    rts = np.round(np.linspace(0.8, 1.6, args.n_rts), 2)
+    targets = [
+        f"/projection?place={place}&rt={rt}&n_days={args.n_days}"
+        for place, rt in zip(
+            rng.choice(places, args.requests), rng.choice(rts, args.requests)
+        )
+    ]
+
+    # warm up the worker processes
+    await asyncio.gather(*(
+        client(port, [f"/projection?place={place}&n_days=1"], [])
+        for place in places[:args.workers]
+    ))
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(port, targets[i::args.concurrency], latencies)
+        for i in range(args.concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1000
+    print(f"requests:    {len(latencies)}")
+    print(f"concurrency: {args.concurrency}")
+    print(f"p50:         {np.percentile(latencies, 50):.1f} ms")
+    print(f"p99:         {np.percentile(latencies, 99):.1f} ms")
+    print(f"throughput:  {len(latencies) / elapsed:.0f} req/s")
+    print(f"service:     {service.stats}")
+
+    server.close()
+    await server.wait_closed()
+    service.executor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--n-days", type=int, default=90)
+    parser.add_argument("--n-rts", type=int, default=9,
+                        help="number of distinct Rt values requested")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -4,6 +4,9 @@ setup(
     name = "simulacovid",
     packages = find_packages(),
     install_requires=[
-        "pandas", "numpy", "scipy", "scikit-learn", "plotly"
-    ]
-)
\ No newline at end of file
+        "pandas", "numpy", "scipy", "scikit-learn", "plotly", "requests", "pyyaml"
+    ],
+    entry_points={
+        "console_scripts": ["simulacovid = simulacovid.cli:main"],
+    },
+)
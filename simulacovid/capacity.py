@@ -0,0 +1,147 @@
+import pandas as pd
+import numpy as np
+
+
+# hospital resources and the compartments that demand them
+RESOURCES = {
+    "number_beds": "I2",
+    "number_icu_beds": "I3",
+}
+
+
+def stack_trajectories(trajectories):
+    """
+    Empilha as projeções de vários locais em arrays de demanda por leitos.
+
+    Params
+    ------
+    trajectories : Dict
+        Dicionário que associa cada local ao resultado de
+        `simulator.run_simulation` (tabelas de projeção por cenário).
+
+    Returns
+    -------
+    stacked : Dict
+        Dicionário com os locais (`places`), os cenários (`scenarios`) e
+        os dias de projeção (`days`), além de um array de demanda com
+        formato (n_places, n_scenarios, n_days) para cada compartimento de
+        `RESOURCES`.
+    """
+
+    places = list(trajectories.keys())
+    scenarios = list(trajectories[places[0]].keys())
+    days = trajectories[places[0]][scenarios[0]].index.to_numpy()
+
+    stacked = {"places": places, "scenarios": scenarios, "days": days}
+    for col in RESOURCES.values():
+        stacked[col] = np.array([
+            [trajectories[place][scenario][col].to_numpy() for scenario in scenarios]
+            for place in places
+        ])
+
+    return stacked
+
+
+def dday_grid(
+    stacked,
+    capacity,
+    proportions=(0.3, 0.5, 0.7, 1.0),
+    added_beds=(0,),
+):
+    """
+    Calcula o número de dias até a demanda ultrapassar a oferta de leitos
+    para uma grade de capacidades, sem rodar novamente a simulação.
+
+    A capacidade hospitalar não altera as equações do modelo, então uma
+    única projeção por local serve a todos os cenários de capacidade. O
+    máximo acumulado da demanda é não decrescente, de modo que uma busca
+    binária (`np.searchsorted`) dá, para cada nível de capacidade, o número
+    de dias em que ele não é ultrapassado, ou seja, a posição do primeiro
+    dia de falta de leitos - o mesmo resultado de `simulator.get_dday`. A
+    memória usada cresce com o horizonte ou com a grade, mas não com o
+    produto dos dois. As buscas são feitas local a local e cenário a
+    cenário (cerca de 0,15 s para 5.570 municípios).
+
+    Params
+    ------
+    stacked : Dict
+        Projeções empilhadas por `stack_trajectories`. O empilhamento é
+        feito uma única vez e reaproveitado em todas as grades.
+    capacity : pd.DataFrame
+        Tabela indexada pelo local, com o total de leitos enfermaria e/ou
+        UTI (`number_beds` e `number_icu_beds`), antes de aplicar
+        `resources_available_proportion`.
+    proportions : tuple
+        Proporções dos leitos disponíveis para COVID-19.
+    added_beds : tuple
+        Quantidades de leitos adicionais, somadas após aplicar a proporção.
+
+    Returns
+    -------
+    ddays : pd.DataFrame
+        Tabela com o dia de esgotamento (`dday`, -1 caso não ocorra no
+        horizonte da projeção) para cada local, cenário, tipo de leito,
+        proporção e quantidade de leitos adicionais.
+    """
+
+    if not set(RESOURCES).intersection(capacity.columns):
+        raise ValueError(
+            f"capacity must have at least one of the columns: {list(RESOURCES)}"
+        )
+
+    proportions = np.asarray(proportions, dtype=float)
+    added_beds = np.asarray(added_beds, dtype=float)
+
+    ddays = []
+    for resource, col in RESOURCES.items():
+        if resource not in capacity.columns:
+            continue
+
+        places, scenarios, days = (
+            stacked["places"], stacked["scenarios"], stacked["days"]
+        )
+        peak = np.maximum.accumulate(stacked[col], axis=-1)
+
+        # capacity levels with shape (n_places, n_proportions, n_added)
+        levels = (
+            capacity[resource].reindex(places).to_numpy()[:, None, None]
+            * proportions[None, :, None]
+            + added_beds[None, None, :]
+        )
+
+        # days until shortage with shape (n_places, n_scenarios, n_prop, n_add)
+        n_days_available = np.empty(
+            (len(places), len(scenarios), *levels.shape[1:]), dtype=int
+        )
+        # one binary search per place and scenario: a single search over
+        # offset-flattened rows would misplace capacities that tie with the
+        # demand (offsets round away the low bits), and sorting all demands
+        # and levels together is slower than these small searches
+        for i, place_peak in enumerate(peak):
+            for j, scenario_peak in enumerate(place_peak):
+                n_days_available[i, j] = np.searchsorted(
+                    scenario_peak, levels[i], side="right"
+                )
+        shortage = n_days_available < len(days)
+        dday = np.where(
+            shortage, days[np.minimum(n_days_available, len(days) - 1)], -1
+        )
+        # places without information on capacity never get a dday
+        dday = np.where(np.isnan(levels)[:, None, :, :], -1, dday)
+
+        index = pd.MultiIndex.from_product(
+            [places, scenarios, proportions, added_beds],
+            names=["place_id", "scenario", "proportion", "added_beds"],
+        )
+        ddays.append(pd.DataFrame(
+            {
+                "resource": resource,
+                "capacity": np.broadcast_to(
+                    levels[:, None, :, :], dday.shape
+                ).ravel(),
+                "dday": dday.ravel(),
+            },
+            index=index,
+        ).reset_index())
+
+    return pd.concat(ddays, ignore_index=True)
@@ -0,0 +1,300 @@
+import gzip
+import hashlib
+import os
+from pathlib import Path
+
+import pandas as pd
+import numpy as np
+
+
+# columns of the brasil.io `caso_full.csv.gz` file used by the ingestion
+_SOURCE_COLUMNS = [
+    "city_ibge_code",
+    "state",
+    "date",
+    "place_type",
+    "last_available_confirmed",
+    "last_available_deaths",
+    "new_confirmed",
+]
+
+# number of leading bytes hashed to tell an appended file from a new one
+_HEAD_BYTES = 1 << 16
+
+
+def _file_head_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(_HEAD_BYTES)).hexdigest()
+
+
+def _load_state(state_path):
+    if state_path is None or not Path(state_path).exists():
+        return None
+    state = pd.read_pickle(state_path)
+    # states saved with a single watermark are ingested again from scratch
+    return state if "watermarks" in state else None
+
+
+def _read_chunks(path, state, chunksize):
+    """
+    Streams the rows of the case file that were not ingested yet.
+
+    If the file only grew since the last ingestion (new gzip members were
+    appended to it), decompression resumes from the last consumed byte, and
+    the appended members are expected to have no header line. Otherwise, the
+    whole file is decompressed again and rows are filtered by the watermark.
+
+    `date` is read as text, so rows can be filtered against the watermark
+    before their dates are parsed.
+    """
+
+    size = os.path.getsize(path)
+    appended = (
+        state is not None
+        and size >= state["file_size"]
+        and _file_head_digest(path) == state["head_digest"]
+    )
+
+    with open(path, "rb") as f:
+        if appended:
+            f.seek(state["file_size"])
+            if state["file_size"] == size:
+                return
+            read_options = {"header": None, "names": state["header"]}
+        else:
+            read_options = {"header": 0}
+
+        with gzip.GzipFile(fileobj=f) as gz:
+            for chunk in pd.read_csv(
+                gz,
+                usecols=_SOURCE_COLUMNS,
+                chunksize=chunksize,
+                dtype={
+                    "city_ibge_code": "float64",
+                    "new_confirmed": "float64",
+                    "date": str,
+                },
+                **read_options,
+            ):
+                yield chunk
+
+
+def _header(path):
+    with gzip.open(path, "rt") as f:
+        return f.readline().strip().split(",")
+
+
+# daily values kept for each city, in the order of the output tables
+_VALUE_COLUMNS = [
+    "last_available_confirmed",
+    "last_available_deaths",
+    "new_confirmed",
+    "daily_cases_sum",
+]
+
+
+def _daily_grid(cities, start, end):
+    """
+    Builds one row per city and day, from `start` to `end` of each city.
+    """
+
+    lengths = ((end - start).dt.days + 1).to_numpy()
+    first_rows = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return pd.DataFrame({
+        "city_ibge_code": np.repeat(cities.index.to_numpy(), lengths),
+        "state": np.repeat(cities["state"].to_numpy(), lengths),
+        "date": (
+            np.repeat(start.to_numpy(), lengths)
+            + pd.to_timedelta(np.arange(lengths.sum()) - first_rows, unit="D")
+        ),
+    })
+
+
+def _aggregate(daily, place_col, rename):
+    """Sums the daily city values into coarser places."""
+    return (
+        daily.groupby([place_col, "date"])[_VALUE_COLUMNS].sum()
+        .reset_index()
+        .rename(columns=rename)
+    )
+
+
+def ingest_cases(
+    path,
+    config,
+    state_path=None,
+    health_regions=None,
+    chunksize=500000,
+):
+    """
+    Processa incrementalmente o arquivo de casos do brasil.io
+    (`caso_full.csv.gz`), calculando as somas móveis de casos no período
+    infeccioso por município, regional de saúde e estado.
+
+    O arquivo é descompactado e lido em blocos, mantendo em memória apenas
+    as colunas necessárias das linhas posteriores à última data já
+    processada de cada estado (marca d'água). Como os estados publicam em
+    dias diferentes, cada município só é preenchido até o último dia
+    publicado pelo seu estado, e um estado atrasado tem seus dias
+    processados na execução seguinte. O estado entre execuções (marcas
+    d'água, posição no arquivo e os últimos dias de casos diários de cada
+    município) é gravado em `state_path`, de modo que a atualização diária
+    só processa os dias novos.
+
+    Se novos membros gzip forem anexados ao final do arquivo, a leitura
+    continua da última posição processada. O brasil.io, porém, substitui o
+    arquivo a cada atualização: nesse caso ele é todo descompactado e lido
+    de novo, e apenas a conversão das datas e a agregação ficam restritas
+    às linhas posteriores à marca d'água (comparada ao texto da data).
+
+    Params
+    ------
+    path : str or Path
+        Caminho local do arquivo `caso_full.csv.gz`.
+    config : Dict
+        Dicionário de configuração, com a seção `br.cases` (mapa de
+        renomeação e `notification_window_days`).
+    state_path : str or Path
+        Arquivo para persistir o estado da ingestão. Se None, todo o
+        arquivo é processado e nenhum estado é gravado.
+    health_regions : pd.Series
+        Mapeamento de código IBGE do município (índice) para
+        `health_region_id`. Se None, a agregação por regional de saúde não
+        é calculada.
+    chunksize : int
+        Número de linhas lidas por bloco.
+
+    Returns
+    -------
+    dfs : Dict
+        Dicionário com tabelas das novas datas para cada nível [ city |
+        health_region | state ], com casos confirmados e óbitos acumulados,
+        casos diários e soma de casos na janela de notificação. Cada
+        município aparece a partir do primeiro dia em que foi publicado.
+    """
+
+    rename = config["br"]["cases"]["rename"]
+    window = config["br"]["cases"]["notification_window_days"]
+
+    state = _load_state(state_path)
+    watermarks = (
+        state["watermarks"] if state is not None
+        else pd.Series(dtype="datetime64[ns]")
+    )
+    watermark_text = watermarks.dt.strftime("%Y-%m-%d")
+
+    new_rows = []
+    for chunk in _read_chunks(path, state, chunksize):
+        keep = (chunk["place_type"] == "city") & chunk["city_ibge_code"].notna()
+        if not watermarks.empty:
+            # ISO dates sort as text, so old rows are dropped before parsing
+            keep &= chunk["date"] > chunk["state"].map(watermark_text).fillna("")
+        chunk = chunk.loc[keep]
+        chunk = chunk.assign(date=pd.to_datetime(chunk["date"]))
+        new_rows.append(chunk.drop(columns="place_type"))
+
+    new_rows = (
+        pd.concat(new_rows, ignore_index=True)
+        if new_rows else pd.DataFrame(columns=_SOURCE_COLUMNS)
+    )
+    if new_rows.empty:
+        if state is not None and state_path is not None:
+            state.update(
+                file_size=os.path.getsize(path), head_digest=_file_head_digest(path)
+            )
+            pd.to_pickle(state, state_path)
+        return {}
+
+    new_rows["city_ibge_code"] = new_rows["city_ibge_code"].astype(np.int64)
+    new_rows = new_rows.drop_duplicates(["city_ibge_code", "date"], keep="last")
+    last_dates = new_rows.groupby("state")["date"].max()
+
+    # days to fill for each city: from its first new row (or the day after
+    # its state's watermark, for known cities) to the last day its state
+    # reported, so a state that reports late is never filled ahead of its
+    # own data
+    cities = new_rows.groupby("city_ibge_code").agg(
+        state=("state", "last"), start=("date", "min")
+    )
+    if state is not None:
+        known = (
+            state["tail"].drop_duplicates("city_ibge_code", keep="last")
+            .set_index("city_ibge_code")["state"]
+        )
+        known = known.loc[known.isin(last_dates.index)]
+        cities = cities.reindex(cities.index.union(known.index))
+        cities["state"] = cities["state"].fillna(known)
+        resumed = cities.index.isin(known.index) & cities["state"].isin(
+            watermarks.index
+        )
+        cities.loc[resumed, "start"] = (
+            cities.loc[resumed, "state"].map(watermarks) + pd.Timedelta(days=1)
+        )
+    end = cities["state"].map(last_dates)
+
+    daily = _daily_grid(cities, cities["start"], end).merge(
+        new_rows[["city_ibge_code", "date", *_VALUE_COLUMNS[:-1]]],
+        on=["city_ibge_code", "date"],
+        how="left",
+    )
+    daily["new"] = True
+
+    # preceded by the days kept from previous ingestions, to carry the
+    # cumulative values and fill the rolling window
+    if state is not None:
+        tail = state["tail"]
+        daily = pd.concat(
+            [tail.loc[tail["city_ibge_code"].isin(cities.index)].assign(new=False),
+             daily],
+            ignore_index=True,
+        )
+    daily = daily.sort_values(["city_ibge_code", "date"], kind="stable")
+    daily = daily.reset_index(drop=True)
+
+    by_city = daily.groupby("city_ibge_code")
+    cumulative = ["last_available_confirmed", "last_available_deaths"]
+    daily[cumulative] = by_city[cumulative].ffill().fillna(0)
+    daily["new_confirmed"] = daily["new_confirmed"].fillna(0)
+    daily["daily_cases_sum"] = (
+        by_city["new_confirmed"].rolling(window, min_periods=1).sum()
+        .reset_index(level=0, drop=True)
+    )
+
+    new_daily = daily.loc[daily["new"]]
+    dfs = {
+        "city": new_daily[
+            ["city_ibge_code", "date", *_VALUE_COLUMNS, "state"]
+        ].rename(columns=rename).reset_index(drop=True)
+    }
+    if health_regions is not None:
+        dfs["health_region"] = _aggregate(
+            new_daily.assign(
+                health_region_id=new_daily["city_ibge_code"].map(health_regions)
+            ),
+            "health_region_id",
+            rename,
+        )
+    dfs["state"] = _aggregate(new_daily, "state", rename)
+
+    if state_path is not None:
+        tail = daily.groupby("city_ibge_code").tail(max(window - 1, 1))
+        if state is not None:
+            tail = pd.concat(
+                [state["tail"].loc[
+                    ~state["tail"]["city_ibge_code"].isin(cities.index)
+                ], tail],
+                ignore_index=True,
+            )
+        pd.to_pickle(
+            {
+                "watermarks": pd.concat([watermarks, last_dates])
+                .groupby(level=0).max(),
+                "file_size": os.path.getsize(path),
+                "head_digest": _file_head_digest(path),
+                "header": state["header"] if state is not None else _header(path),
+                "tail": tail.drop(columns="new").reset_index(drop=True),
+            },
+            state_path,
+        )
+
+    return dfs
@@ -0,0 +1,243 @@
+"""
+Command line interface of the simulator.
+
+Heavy dependencies (pandas, scipy and the models) are only imported inside
+the subcommands that use them, and the configuration is read from the
+validated cache kept by `configuration.load_config`, so short runs start
+quickly.
+"""
+
+import argparse
+import math
+import sys
+from pathlib import Path
+
+
+# repository root, where the default configuration and data files are kept
+ROOT = Path(__file__).resolve().parents[1]
+
+# arguments with input files
+_INPUT_PATHS = ["config", "history", "parameters", "predictions"]
+
+
+# IBGE codes of the states; predictions are identified by `state_num_id`,
+# while the Farol history only has `state_id`
+# SEE: https://servicodados.ibge.gov.br/api/v1/localidades/estados/
+STATE_NUM_IDS = {
+    "RO": 11, "AC": 12, "AM": 13, "RR": 14, "PA": 15, "AP": 16, "TO": 17,
+    "MA": 21, "PI": 22, "CE": 23, "RN": 24, "PB": 25, "PE": 26, "AL": 27,
+    "SE": 28, "BA": 29, "MG": 31, "ES": 32, "RJ": 33, "SP": 35, "PR": 41,
+    "SC": 42, "RS": 43, "MS": 50, "MT": 51, "GO": 52, "DF": 53,
+}
+
+
+def _input_path(path):
+    """
+    Find an input file relative to the current directory or, failing that,
+    to the repository root (so the defaults work from any directory, e.g.
+    in a cron job).
+    """
+
+    for candidate in (Path(path), ROOT / path):
+        if candidate.exists():
+            return candidate
+    raise SystemExit(f"File not found: {path}")
+
+
+def _load_history(path):
+    """Load the Farol history from a CSV file or a `history` store."""
+
+    if Path(path).is_dir():
+        from .history import read_history
+
+        return read_history(path)
+
+    import pandas as pd
+
+    return pd.read_csv(path)
+
+
+def _latest_row(history, place_id, place, date_col, date=None):
+    import pandas as pd
+
+    rows = history.loc[history[place_id].astype(str) == str(place)]
+    rows = rows.assign(**{date_col: pd.to_datetime(rows[date_col])})
+    if date is not None:
+        rows = rows.loc[rows[date_col] <= pd.Timestamp(date)]
+    if rows.empty:
+        raise SystemExit(f"No Farol data for {place_id} = {place}.")
+    return rows.sort_values(date_col).iloc[-1]
+
+
+def _add_state_ids(df):
+    """Add whichever of `state_id` and `state_num_id` a table is missing."""
+
+    if "state_num_id" not in df.columns and "state_id" in df.columns:
+        df = df.assign(state_num_id=df["state_id"].map(STATE_NUM_IDS))
+    elif "state_id" not in df.columns and "state_num_id" in df.columns:
+        state_ids = {num_id: state_id for state_id, num_id in STATE_NUM_IDS.items()}
+        df = df.assign(state_id=df["state_num_id"].map(state_ids))
+    return df
+
+
+def _load_place_params(path, place_id, config):
+    """
+    Load place-specific parameters, recalculating severity percentages
+    with the asymptomatic fraction if the file does not have them.
+    """
+
+    import pandas as pd
+
+    params = pd.read_csv(path)
+    if "i0_percentage" not in params.columns:
+        asymptomatic = config["br"]["seir_parameters"]["asymptomatic_proportion"]
+        params["i0_percentage"] = asymptomatic
+        severity = ["i1_percentage", "i2_percentage", "i3_percentage"]
+        params[severity] = params[severity] * (1 - asymptomatic)
+    return params.set_index(place_id)
+
+
+def _simulate(args, config):
+    from . import prepare, simulator
+
+    history = _load_history(args.history)
+    row = _latest_row(history, args.place_id, args.place, args.date_col, args.date)
+    if args.beds is not None:
+        row["number_beds"] = args.beds
+    if args.icu_beds is not None:
+        row["number_icu_beds"] = args.icu_beds
+
+    place_specific_params = _load_place_params(args.parameters, args.place_id, config)
+    place_specific_params.index = place_specific_params.index.astype(str)
+    row[args.place_id] = str(row[args.place_id])
+
+    params = prepare.prepare_simulation(
+        row, args.place_id, config, place_specific_params
+    )
+    if not isinstance(params, dict):
+        raise SystemExit(f"No projection available for {args.place}.")
+    if args.rt is not None:
+        params["R0"] = {"best": args.rt, "worst": args.rt}
+
+    dfs = simulator.run_simulation(params, config, model=args.model)
+
+    return params, dfs
+
+
+def project(args, config):
+    import pandas as pd
+
+    _, dfs = _simulate(args, config)
+    result = pd.concat(
+        [df.assign(scenario=scenario) for scenario, df in dfs.items()]
+    )
+    result.to_csv(args.output or sys.stdout)
+
+
+def dday(args, config):
+    from .simulator import get_dday
+
+    params, dfs = _simulate(args, config)
+    for resource, col, capacity in [
+        ("beds", "I2", params["n_beds"]),
+        ("icu_beds", "I3", params["n_icu_beds"]),
+    ]:
+        if math.isnan(capacity):
+            # without the number of beds, "never exceeded" would be a guess
+            for scenario in dfs:
+                print(f"{resource}\t{scenario}\tunknown")
+            continue
+        for scenario, days in get_dday(dfs, col, capacity).items():
+            print(f"{resource}\t{scenario}\t{days}")
+
+
+def backtest(args, config):
+    import pandas as pd
+    from .evaluation import match_outcomes, score_predictions
+
+    predictions = _add_state_ids(pd.read_csv(args.predictions))
+    observed = _add_state_ids(_load_history(args.history))
+    matched = match_outcomes(
+        predictions,
+        observed,
+        place_id=args.place_id,
+        date_col=args.date_col,
+        tolerance_days=args.tolerance_days,
+    )
+    by = args.by or ["model", "days", args.place_id]
+    scores = score_predictions(matched, place_id=args.place_id, by=by)
+    scores.to_csv(args.output or sys.stdout)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="simulacovid",
+        description="Projeções de demanda hospitalar com os modelos SEIR e SEAPMDR.",
+    )
+    parser.add_argument(
+        "--config", default="custom_configs.yaml", help="arquivo de configuração"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--history",
+        default="data/br-states-farolcovid-history.csv",
+        help="histórico do Farol (CSV ou diretório gerado por `history`)",
+    )
+    common.add_argument("--date-col", default="last_updated_cases")
+    common.add_argument("--output", help="arquivo de saída (padrão: stdout)")
+
+    simulation = argparse.ArgumentParser(add_help=False)
+    simulation.add_argument("place", help="identificador do local")
+    simulation.add_argument("--place-id", default="state_id")
+    simulation.add_argument(
+        "--parameters",
+        required=True,
+        help="CSV de parâmetros por local (taxas de hospitalização e mortalidade)",
+    )
+    simulation.add_argument("--model", default="SEAPMDR", choices=["SEIR", "SEAPMDR"])
+    simulation.add_argument("--rt", type=float, help="substitui o Rt estimado")
+    simulation.add_argument("--date", help="data da projeção (padrão: a mais recente)")
+    simulation.add_argument("--beds", type=float, help="total de leitos enfermaria")
+    simulation.add_argument("--icu-beds", type=float, help="total de leitos UTI")
+
+    subparsers.add_parser(
+        "project", parents=[common, simulation], help="projeta um local"
+    ).set_defaults(func=project)
+    subparsers.add_parser(
+        "dday", parents=[common, simulation], help="dias até esgotar os leitos"
+    ).set_defaults(func=dday)
+
+    backtest_parser = subparsers.add_parser(
+        "backtest", parents=[common], help="avalia previsões passadas"
+    )
+    backtest_parser.add_argument("--place-id", default="state_num_id")
+    backtest_parser.add_argument(
+        "--predictions", default="data/br-states-simulacovid-predictions.csv"
+    )
+    backtest_parser.add_argument(
+        "--by",
+        nargs="+",
+        help="colunas de agrupamento (padrão: model, days e o `--place-id`)",
+    )
+    backtest_parser.add_argument("--tolerance-days", type=int, default=0)
+    backtest_parser.set_defaults(func=backtest)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    for arg in _INPUT_PATHS:
+        if getattr(args, arg, None) is not None:
+            setattr(args, arg, _input_path(getattr(args, arg)))
+
+    from .configuration import load_config
+
+    config = load_config(args.config)
+    args.func(args, config)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import hashlib
+import os
+import pickle
+from pathlib import Path
+
+
+# version of the validation applied to cached configurations; bump it when
+# `validate_config` changes, so older caches are not served
+CACHE_VERSION = 1
+
+# epidemiological parameters every model run depends on
+REQUIRED_DISEASE_PARAMS = [
+    "asymptomatic_proportion",
+    "asymptomatic_duration",
+    "mild_duration",
+    "severe_duration",
+    "critical_duration",
+    "fatality_ratio",
+    "doubling_rate",
+    "incubation_period",
+    "presymptomatic_period",
+    "i0_percentage",
+    "i1_percentage",
+    "i2_percentage",
+    "i3_percentage",
+    "infected_health_care_proportion",
+]
+
+_DURATIONS = [
+    "asymptomatic_duration",
+    "mild_duration",
+    "severe_duration",
+    "critical_duration",
+    "incubation_period",
+    "presymptomatic_period",
+]
+
+_PROPORTIONS = [
+    "asymptomatic_proportion",
+    "fatality_ratio",
+    "i0_percentage",
+    "i1_percentage",
+    "i2_percentage",
+    "i3_percentage",
+    "infected_health_care_proportion",
+]
+
+
+def _default_cache_dir():
+    return Path(
+        os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"), "simulacovid"
+    )
+
+
+def validate_config(config):
+    """
+    Check that a configuration has the sections and values the simulator
+    needs, raising a ValueError that lists every problem found.
+
+    Params
+    --------
+    config: dict
+            Parsed configuration (`custom_configs.yaml`).
+    """
+
+    problems = []
+
+    def get(*keys):
+        section = config
+        for key in keys:
+            if not isinstance(section, dict) or key not in section:
+                problems.append(f"missing `{'.'.join(keys)}`")
+                return None
+            section = section[key]
+        return section
+
+    get("refresh_rate")
+    get("br", "api", "external")
+    get("br", "api", "endpoints")
+    proportion = get("br", "simulacovid", "resources_available_proportion")
+    if isinstance(proportion, (int, float)) and not 0 < proportion <= 1:
+        problems.append("`resources_available_proportion` must be in (0, 1]")
+
+    disease_params = get("br", "seir_parameters") or {}
+    for param in REQUIRED_DISEASE_PARAMS:
+        value = disease_params.get(param)
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            problems.append(f"`br.seir_parameters.{param}` must be a number")
+        elif param in _DURATIONS and value <= 0:
+            problems.append(f"`br.seir_parameters.{param}` must be positive")
+        elif param in _PROPORTIONS and not 0 <= value <= 1:
+            problems.append(f"`br.seir_parameters.{param}` must be in [0, 1]")
+
+    if not problems and (
+        disease_params["incubation_period"]
+        <= disease_params["presymptomatic_period"]
+    ):
+        problems.append("`incubation_period` must exceed `presymptomatic_period`")
+
+    if problems:
+        raise ValueError("Invalid configuration: " + "; ".join(problems))
+
+
+def load_config(path="custom_configs.yaml", cache_dir=None):
+    """
+    Load, validate and cache a YAML configuration file.
+
+    The parsed and validated configuration is pickled in `cache_dir` under
+    the SHA-256 of the file contents and `CACHE_VERSION`, so later loads of
+    the same file skip importing and running the YAML parser.
+
+    Params
+    --------
+    path: str or Path
+            Configuration file.
+    cache_dir: str or Path
+            Cache directory. Defaults to `$XDG_CACHE_HOME/simulacovid` (or
+            `~/.cache/simulacovid`).
+
+    Returns
+    --------
+    dict
+            Validated configuration.
+    """
+
+    raw = Path(path).read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    cache_file = Path(
+        cache_dir or _default_cache_dir(), f"config-v{CACHE_VERSION}-{digest}.pickle"
+    )
+
+    try:
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    import yaml
+
+    config = yaml.load(raw, Loader=yaml.FullLoader)
+    validate_config(config)
+
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temporary = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(temporary, "wb") as f:
+            pickle.dump(config, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, cache_file)
+    except OSError:
+        pass  # a read-only cache only costs parsing the file again
+
+    return config
@@ -0,0 +1,201 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# identifier columns parsed as (nullable) integers
+_ID_COLUMNS = ["state_num_id", "health_region_id", "city_id"]
+
+
+def endpoint_path(endpoints, endpoint):
+    """
+    Resolve an endpoint name, with dotted levels (e.g. "farolcovid.state"
+    or "parameters.state_num_id"), into its path in the API.
+
+    Params
+    --------
+    endpoints: dict
+            Endpoint paths, as in `br.api.endpoints` of the configuration.
+    endpoint: str
+            Endpoint name.
+    """
+
+    path = endpoints
+    for key in endpoint.split("."):
+        path = path[key]
+    if not isinstance(path, str):
+        raise KeyError(
+            f"Endpoint {endpoint!r} has levels: {', '.join(path.keys())}"
+        )
+    return path
+
+
+def _write_atomic(path, data):
+    """
+    Write a file through a temporary one, so concurrent readers (e.g. a
+    scheduled refresh and the service) never see it partially written.
+    """
+
+    temporary = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
+
+
+def _typed_frame(body):
+    """Parse a CSV payload, typing place identifiers and date columns."""
+
+    df = pd.read_csv(io.BytesIO(body))
+    for col in df.columns:
+        if col in _ID_COLUMNS:
+            df[col] = df[col].astype("Int64")
+        elif col.startswith("last_updated") or col in ("date", "data_last_refreshed"):
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    return df
+
+
+class DataSourceClient:
+    """
+    Client for the coronacidades datasource API.
+
+    Connections to the API host are pooled and reused; several endpoints can
+    be fetched concurrently; and every response is stored in an on-disk
+    cache. Cached responses younger than `refresh_rate` are used without any
+    request, and older ones are revalidated with conditional requests (ETag
+    and Last-Modified), so unchanged endpoints are not downloaded again.
+
+    Params
+    --------
+    config: dict
+            Configuration dictionary (`custom_configs.yaml`), with the API
+            addresses in `br.api` and the `refresh_rate` (in minutes).
+    base_url: str
+            API address. Defaults to `br.api.external`.
+    cache_dir: str or Path
+            Directory for cached responses. Defaults to
+            `~/.cache/simulacovid/datasource`.
+    max_connections: int
+            Maximum number of simultaneous connections (and fetches).
+    timeout: float
+            Timeout, in seconds, of each request.
+    """
+
+    def __init__(
+        self,
+        config,
+        base_url=None,
+        cache_dir=None,
+        max_connections=8,
+        timeout=60,
+    ):
+        self.base_url = (base_url or config["br"]["api"]["external"]).rstrip("/")
+        self.endpoints = config["br"]["api"]["endpoints"]
+        self.refresh_rate = config["refresh_rate"] * 60  # seconds
+        self.timeout = timeout
+        self.cache_dir = Path(
+            cache_dir or Path.home() / ".cache" / "simulacovid" / "datasource"
+        )
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=max_connections, pool_maxsize=max_connections
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_connections)
+
+    def path(self, endpoint):
+        """Path of an endpoint in the API (see `endpoint_path`)."""
+        return endpoint_path(self.endpoints, endpoint)
+
+    def _cache_files(self, url):
+        key = hashlib.sha1(url.encode()).hexdigest()
+        return self.cache_dir / f"{key}.csv", self.cache_dir / f"{key}.json"
+
+    def fetch_raw(self, endpoint):
+        """
+        Get the body of an endpoint, from the cache when it is still valid.
+
+        Returns
+        --------
+        bytes
+                Response body.
+        """
+
+        url = f"{self.base_url}/{self.path(endpoint)}"
+        body_file, meta_file = self._cache_files(url)
+
+        meta = {}
+        if body_file.exists() and meta_file.exists():
+            meta = json.loads(meta_file.read_text())
+            if time.time() - meta["fetched_at"] < self.refresh_rate:
+                return body_file.read_bytes()
+
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            meta["fetched_at"] = time.time()
+            _write_atomic(meta_file, json.dumps(meta).encode())
+            return body_file.read_bytes()
+        response.raise_for_status()
+
+        # the body is replaced before its validators: a reader in between
+        # pairs the new body with the old ETag, which only costs a download
+        _write_atomic(body_file, response.content)
+        _write_atomic(meta_file, json.dumps({
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }).encode())
+        return response.content
+
+    def fetch(self, endpoint):
+        """
+        Get an endpoint as a DataFrame, with typed identifiers and dates.
+
+        Returns
+        --------
+        pd.DataFrame
+        """
+        return _typed_frame(self.fetch_raw(endpoint))
+
+    async def fetch_many_async(self, endpoints):
+        """
+        Fetch several endpoints concurrently, over the pooled connections.
+
+        Returns
+        --------
+        dict
+                DataFrame of each endpoint.
+        """
+
+        loop = asyncio.get_running_loop()
+        frames = await asyncio.gather(*(
+            loop.run_in_executor(self.executor, self.fetch, endpoint)
+            for endpoint in endpoints
+        ))
+        return dict(zip(endpoints, frames))
+
+    def fetch_many(self, endpoints):
+        """Blocking version of `fetch_many_async`."""
+        return dict(zip(endpoints, self.executor.map(self.fetch, endpoints)))
+
+    def close(self):
+        self.executor.shutdown()
+        self.session.close()
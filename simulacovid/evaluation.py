@@ -0,0 +1,174 @@
+import pandas as pd
+import numpy as np
+
+
+# realized Farol indicators and the model compartments that predict them
+TARGETS = {
+    "deaths": ["D"],
+    "active_cases": ["I0", "I1", "I2", "I3"],
+}
+
+# columns identifying a single forecast trajectory
+_FORECAST_KEYS = ["model", "date_prediction", "days"]
+
+
+def match_outcomes(
+    predictions,
+    observed,
+    place_id="state_num_id",
+    date_col="last_updated_cases",
+    tolerance_days=0,
+    first_day=1,
+):
+    """
+    Junta cada previsão aos valores realizados do Farol para o mesmo local
+    e data-alvo (`date_prediction` + `days` - `first_day`).
+
+    Em `simulator.run_simulation`, os dias da projeção começam em 1: o dia
+    1 é o estado inicial (t=0), que corresponde à própria
+    `date_prediction`, e o dia `days` está `days - 1` dias depois dela.
+
+    A junção é feita de uma só vez com `pd.merge_asof`, ordenando
+    previsões e observações pela data-alvo. Se não houver observação
+    exatamente na data-alvo, usa-se a última observação anterior dentro da
+    tolerância indicada.
+
+    Params
+    ------
+    predictions : pd.DataFrame
+        Tabela de previsões, como a gravada em
+        `data/br-states-simulacovid-predictions.csv`.
+    observed : pd.DataFrame
+        Histórico do Farol, com o identificador do local, a data e os
+        indicadores realizados (`TARGETS`).
+    place_id : str
+        Coluna com o identificador do local nas duas tabelas.
+    date_col : str
+        Coluna com a data das observações do Farol.
+    tolerance_days : int
+        Número máximo de dias entre a data-alvo e a observação usada.
+    first_day : int
+        Valor de `days` do estado inicial da projeção (1 nas previsões de
+        `simulator.run_simulation`; 0 para projeções indexadas a partir de
+        zero, como as de `metapopulation.entrypoint`).
+
+    Returns
+    -------
+    matched : pd.DataFrame
+        Previsões com a data-alvo, os valores previstos (`predicted_*`) e
+        realizados (`observed_*`) de cada indicador. Previsões sem
+        observação correspondente são descartadas.
+    """
+
+    predictions = predictions.assign(
+        date_prediction=lambda df: pd.to_datetime(df["date_prediction"]),
+        target_date=lambda df: (
+            df["date_prediction"]
+            + pd.to_timedelta(df["days"] - first_day, unit="D")
+        ),
+    )
+    for target, compartments in TARGETS.items():
+        # SEIR has no asymptomatic compartment; missing columns are skipped
+        available = [col for col in compartments if col in predictions.columns]
+        predictions[f"predicted_{target}"] = (
+            predictions[available].sum(axis=1, min_count=1)
+        )
+
+    observed = (
+        observed[[place_id, date_col, *TARGETS.keys()]]
+        .rename(columns={target: f"observed_{target}" for target in TARGETS})
+        .assign(**{date_col: lambda df: pd.to_datetime(df[date_col])})
+        .dropna(subset=[date_col])
+        .sort_values(date_col)
+    )
+
+    matched = pd.merge_asof(
+        predictions.sort_values("target_date"),
+        observed,
+        left_on="target_date",
+        right_on=date_col,
+        by=place_id,
+        direction="backward",
+        tolerance=pd.Timedelta(days=tolerance_days),
+    )
+
+    return matched.dropna(
+        subset=[f"observed_{target}" for target in TARGETS], how="all"
+    ).reset_index(drop=True)
+
+
+def score_predictions(
+    matched,
+    place_id="state_num_id",
+    by=("model", "days", "state_num_id"),
+    point_scenario="best",
+):
+    """
+    Calcula erro absoluto médio (MAE), erro percentual absoluto médio
+    (MAPE) e cobertura das previsões.
+
+    O erro é calculado para o cenário pontual (por padrão, o "best", que
+    usa o Rt mais provável). A cobertura é a proporção de observações que
+    ficaram entre os cenários de melhor e pior caso da mesma previsão.
+
+    Params
+    ------
+    matched : pd.DataFrame
+        Previsões com valores realizados, como retornadas por
+        `match_outcomes`.
+    place_id : str
+        Coluna com o identificador do local.
+    by : tuple
+        Colunas para agrupar as métricas (ex.: `("model", "days")` para
+        resumir todos os locais).
+    point_scenario : str
+        Cenário usado como previsão pontual [ best | worst ].
+
+    Returns
+    -------
+    scores : pd.DataFrame
+        Métricas indexadas pelo indicador e pelas colunas de agrupamento,
+        com o número de previsões avaliadas (`n`).
+    """
+
+    by = list(by)
+    keys = _FORECAST_KEYS + [place_id]
+
+    scores = []
+    for target in TARGETS:
+        predicted, observed = f"predicted_{target}", f"observed_{target}"
+        valid = matched.dropna(subset=[predicted, observed])
+
+        # lower and upper scenario bounds of each forecast
+        bounds = (
+            valid.groupby(keys)[predicted].agg(lower="min", upper="max")
+            .reset_index()
+        )
+        point = valid.loc[valid["scenario"] == point_scenario].merge(
+            bounds, on=keys, how="left"
+        )
+
+        error = (point[predicted] - point[observed]).abs()
+        point = point.assign(
+            abs_error=error,
+            abs_perc_error=(
+                error / point[observed].where(point[observed] != 0, np.nan)
+            ),
+            covered=(
+                (point["lower"] <= point[observed])
+                & (point[observed] <= point["upper"])
+            ).astype(float),
+        )
+
+        target_scores = (
+            point.groupby(by)
+            .agg(
+                mae=("abs_error", "mean"),
+                mape=("abs_perc_error", "mean"),
+                coverage=("covered", "mean"),
+                n=("abs_error", "size"),
+            )
+        )
+        scores.append(pd.concat({target: target_scores}, names=["target"]))
+
+    return pd.concat(scores)
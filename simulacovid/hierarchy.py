@@ -0,0 +1,207 @@
+import pandas as pd
+import numpy as np
+from scipy import sparse
+
+
+# place levels, from the finest to the coarsest
+LEVELS = ["city_id", "health_region_id", "state_num_id"]
+
+
+def aggregation_matrix(children, parents):
+    """
+    Build the sparse matrix that sums child places into their parents.
+
+    Params
+    --------
+    children: array-like
+            Identifier of each child place, in the order of the trajectories.
+    parents: array-like
+            Identifier of the parent of each child place.
+
+    Returns
+    --------
+    tuple
+            The parent identifiers (sorted) and a 0/1 scipy.sparse.csr_matrix
+            with shape (n_parents, n_children).
+    """
+
+    parent_ids, parent_index = np.unique(np.asarray(parents), return_inverse=True)
+    n_children = len(children)
+    matrix = sparse.csr_matrix(
+        (np.ones(n_children), (parent_index, np.arange(n_children))),
+        shape=(len(parent_ids), n_children),
+    )
+    return parent_ids, matrix
+
+
+def build_hierarchy(places, levels=LEVELS):
+    """
+    Build the aggregation matrices between every pair of place levels.
+
+    Params
+    --------
+    places: pd.DataFrame
+            Table with one row per place of the finest level and a column
+            with its identifier at each level (e.g. `city_id`,
+            `health_region_id` and `state_num_id`). A place listed with
+            more than one parent, or without an identifier at some level,
+            raises a ValueError.
+    levels: list
+            Columns of the levels, from the finest to the coarsest.
+
+    Returns
+    --------
+    dict
+            - ids: identifiers of the places of each level, in the order
+              used by the matrices.
+            - matrices: dictionary mapping (fine level, coarse level) to the
+              sparse matrix that sums the first into the second.
+    """
+
+    missing = places[levels].isna().any()
+    if missing.any():
+        raise ValueError(
+            f"Places without an identifier of: {missing.index[missing].tolist()}"
+        )
+
+    # each place must belong to a single place of the next level; checked
+    # on every row, before repeated places are dropped
+    for fine, coarse in zip(levels[:-1], levels[1:]):
+        conflicts = places.groupby(fine)[coarse].nunique()
+        if (conflicts > 1).any():
+            raise ValueError(
+                f"Places of `{fine}` with more than one `{coarse}`: "
+                f"{conflicts.index[conflicts > 1].tolist()}"
+            )
+
+    places = places.drop_duplicates(levels[0])
+    ids = {levels[0]: places[levels[0]].to_numpy()}
+    matrices = {}
+
+    for fine, coarse in zip(levels[:-1], levels[1:]):
+        parents = places.drop_duplicates(fine).set_index(fine)[coarse]
+        ids[coarse], matrices[(fine, coarse)] = aggregation_matrix(
+            ids[fine], parents.loc[ids[fine]].to_numpy()
+        )
+
+    # compose the matrices to skip intermediate levels
+    for i, fine in enumerate(levels):
+        for middle, coarse in zip(levels[i + 1:-1], levels[i + 2:]):
+            matrices[(fine, coarse)] = (
+                matrices[(middle, coarse)] @ matrices[(fine, middle)]
+            ).tocsr()
+
+    return {"ids": ids, "matrices": matrices}
+
+
+def aggregate(states, matrix, block_days=30):
+    """
+    Sum the trajectories of fine-grained places into coarser ones.
+
+    Params
+    --------
+    states: np.array
+            Trajectories with shape (n_days, n_compartments, n_children), as
+            returned by `metapopulation.solve`.
+    matrix: scipy.sparse matrix
+            Aggregation matrix with shape (n_parents, n_children).
+    block_days: int
+            Number of days aggregated by each sparse product, to bound the
+            memory of the intermediate arrays.
+
+    Returns
+    --------
+    np.array
+            Trajectories with shape (n_days, n_compartments, n_parents).
+    """
+
+    n_days, n_compartments, n_children = states.shape
+    result = np.empty((n_days, n_compartments, matrix.shape[0]))
+
+    for start in range(0, n_days, block_days):
+        block = states[start:start + block_days]
+        # (n_children, days * compartments) -> (n_parents, days * compartments)
+        summed = matrix @ block.reshape(-1, n_children).T
+        result[start:start + block_days] = summed.T.reshape(
+            block.shape[0], n_compartments, -1
+        )
+
+    return result
+
+
+def reconcile(child_states, parent_states, matrix, block_days=30):
+    """
+    Scale the trajectories of child places so that they add up to the
+    independently simulated trajectories of their parents.
+
+    Each child keeps its share of its parent's total, for every day and
+    compartment (proportional top-down reconciliation). Where the children
+    of a parent add up to zero, they are kept unchanged.
+
+    Params
+    --------
+    child_states: np.array
+            Trajectories with shape (n_days, n_compartments, n_children).
+    parent_states: np.array
+            Trajectories with shape (n_days, n_compartments, n_parents), with
+            the parents in the order of the rows of `matrix`.
+    matrix: scipy.sparse matrix
+            Aggregation matrix with shape (n_parents, n_children).
+    block_days: int
+            Number of days handled by each sparse product.
+
+    Returns
+    --------
+    np.array
+            Reconciled child trajectories, with the same shape as
+            `child_states`.
+    """
+
+    n_days, n_compartments, n_children = child_states.shape
+    summed = aggregate(child_states, matrix, block_days=block_days)
+    factor = np.divide(
+        parent_states, summed, out=np.ones_like(summed), where=summed != 0
+    )
+
+    result = np.empty_like(child_states, dtype=float)
+    expand = matrix.T.tocsr()
+    for start in range(0, n_days, block_days):
+        block = factor[start:start + block_days]
+        # broadcast each parent's factor to its children
+        child_factor = expand @ block.reshape(-1, matrix.shape[0]).T
+        result[start:start + block_days] = (
+            child_states[start:start + block_days]
+            * child_factor.T.reshape(block.shape[0], n_compartments, n_children)
+        )
+
+    return result
+
+
+def to_frame(states, place_ids, compartments, level):
+    """
+    Convert an array of trajectories into a table indexed by place and day.
+
+    Params
+    --------
+    states: np.array
+            Trajectories with shape (n_days, n_compartments, n_places).
+    place_ids: array-like
+            Identifiers of the places.
+    compartments: list
+            Names of the compartments.
+    level: str
+            Name of the place level (used as the index name).
+
+    Returns
+    --------
+    pd.DataFrame
+    """
+
+    n_days = states.shape[0]
+    return pd.DataFrame(
+        states.transpose(2, 0, 1).reshape(-1, len(compartments)),
+        columns=compartments,
+        index=pd.MultiIndex.from_product(
+            [place_ids, np.arange(n_days)], names=[level, "dias"]
+        ),
+    )
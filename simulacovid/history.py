@@ -0,0 +1,207 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+import numpy as np
+
+
+# columns of the Farol history used by `prepare.prepare_simulation`
+SIMULATION_COLUMNS = [
+    "population",
+    "active_cases",
+    "confirmed_cases",
+    "deaths",
+    "notification_rate",
+    "rt_most_likely",
+    "rt_high_95",
+    "number_beds",
+    "number_icu_beds",
+]
+
+_META_FILE = "meta.json"
+_OFFSETS_FILE = "offsets.npy"
+
+
+def _column_file(store_path, column):
+    return Path(store_path, f"{column}.npy")
+
+
+def convert_history(
+    csv_path,
+    store_path,
+    place_col="state_id",
+    date_col="last_updated_cases",
+):
+    """
+    Converte o histórico do Farol em CSV para um armazenamento colunar
+    binário, ordenado e indexado por local e data.
+
+    Cada coluna é gravada em um arquivo `.npy` próprio, que pode ser
+    aberto como `np.memmap` sem conversões. Colunas de texto são
+    gravadas como códigos inteiros, com as categorias listadas no
+    arquivo de metadados.
+
+    Params
+    ------
+    csv_path : str or Path
+        Caminho para o arquivo CSV do histórico (ex.:
+        `data/br-states-farolcovid-history.csv`).
+    store_path : str or Path
+        Diretório de destino do armazenamento colunar.
+    place_col : str
+        Coluna com o identificador do local.
+    date_col : str
+        Coluna com a data de referência de cada linha.
+
+    Returns
+    -------
+    store_path : Path
+        Diretório onde o armazenamento foi gravado.
+    """
+
+    df = pd.read_csv(csv_path)
+    df = (
+        df
+        .dropna(subset=[place_col, date_col])
+        .assign(**{date_col: lambda df: pd.to_datetime(df[date_col])})
+        .sort_values([place_col, date_col], kind="stable")
+        .reset_index(drop=True)
+    )
+
+    store_path = Path(store_path)
+    store_path.mkdir(parents=True, exist_ok=True)
+
+    # row offsets of each place: rows of place i are offsets[i]:offsets[i+1]
+    places, counts = np.unique(df[place_col].to_numpy(), return_counts=True)
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    np.save(store_path / _OFFSETS_FILE, offsets)
+
+    columns = {}
+    for column in df.columns.drop(place_col):
+        values = df[column]
+        if column == date_col:
+            np.save(
+                _column_file(store_path, column),
+                values.to_numpy().astype("datetime64[D]"),
+            )
+            columns[column] = {"kind": "date"}
+        elif pd.api.types.is_numeric_dtype(values):
+            np.save(
+                _column_file(store_path, column),
+                values.to_numpy(dtype=np.float64),
+            )
+            columns[column] = {"kind": "numeric"}
+        else:
+            categorical = pd.Categorical(values.astype("string"))
+            np.save(
+                _column_file(store_path, column),
+                categorical.codes.astype(np.int32),
+            )
+            columns[column] = {
+                "kind": "category",
+                "categories": categorical.categories.tolist(),
+            }
+
+    meta = {
+        "place_col": place_col,
+        "date_col": date_col,
+        "places": places.tolist(),
+        "n_rows": int(len(df)),
+        "columns": columns,
+    }
+    with open(store_path / _META_FILE, "w") as f:
+        json.dump(meta, f)
+
+    return store_path
+
+
+def read_history(store_path, columns=None, places=None, start=None, end=None):
+    """
+    Lê um recorte do histórico do Farol a partir do armazenamento colunar.
+
+    Apenas as colunas pedidas são abertas (como mapas de memória, de modo
+    que processos diferentes compartilham o cache de páginas do sistema).
+    Cada local ocupa um bloco contíguo de linhas ordenadas por data, e o
+    intervalo de datas é localizado por busca binária.
+
+    Params
+    ------
+    store_path : str or Path
+        Diretório gerado por `convert_history`.
+    columns : list
+        Colunas a carregar. Por padrão, as colunas necessárias para
+        `prepare.prepare_simulation` (`SIMULATION_COLUMNS`) disponíveis.
+    places : list
+        Identificadores dos locais a carregar. Por padrão, todos.
+    start : str or datetime
+        Data inicial (inclusive) do recorte.
+    end : str or datetime
+        Data final (inclusive) do recorte.
+
+    Returns
+    -------
+    df : pd.DataFrame
+        Tabela com o identificador do local, a data e as colunas pedidas.
+    """
+
+    store_path = Path(store_path)
+    with open(store_path / _META_FILE, "r") as f:
+        meta = json.load(f)
+    place_col, date_col = meta["place_col"], meta["date_col"]
+
+    if columns is None:
+        columns = [col for col in SIMULATION_COLUMNS if col in meta["columns"]]
+    missing = set(columns) - set(meta["columns"]) - {place_col}
+    if missing:
+        raise KeyError(f"Columns not found in history store: {sorted(missing)}")
+    columns = [col for col in columns if col not in (place_col, date_col)]
+
+    offsets = np.load(store_path / _OFFSETS_FILE)
+    dates = np.load(_column_file(store_path, date_col), mmap_mode="r")
+
+    place_index = {place: i for i, place in enumerate(meta["places"])}
+    if places is None:
+        places = meta["places"]
+    places = [place for place in places if place in place_index]
+
+    start = np.datetime64(pd.Timestamp(start).date()) if start is not None else None
+    end = np.datetime64(pd.Timestamp(end).date()) if end is not None else None
+
+    # find the rows of each place within the date range
+    slices = []
+    for place in places:
+        lo, hi = offsets[place_index[place]], offsets[place_index[place] + 1]
+        place_dates = dates[lo:hi]
+        first = lo + (
+            np.searchsorted(place_dates, start, side="left") if start is not None else 0
+        )
+        last = lo + (
+            np.searchsorted(place_dates, end, side="right")
+            if end is not None else hi - lo
+        )
+        slices.append((place, first, last))
+
+    rows = np.concatenate(
+        [np.arange(first, last) for _, first, last in slices]
+        or [np.array([], dtype=np.int64)]
+    )
+
+    df = pd.DataFrame({
+        place_col: np.repeat(
+            [place for place, _, _ in slices],
+            [last - first for _, first, last in slices],
+        ),
+        date_col: pd.to_datetime(dates[rows]),
+    })
+    for column in columns:
+        values = np.load(_column_file(store_path, column), mmap_mode="r")[rows]
+        column_meta = meta["columns"][column]
+        if column_meta["kind"] == "category":
+            values = pd.Categorical.from_codes(
+                values, categories=column_meta["categories"]
+            )
+        elif column_meta["kind"] == "date":
+            values = pd.to_datetime(values)
+        df[column] = values
+
+    return df
@@ -0,0 +1,335 @@
+import pandas as pd
+import numpy as np
+from scipy import sparse
+from scipy.integrate import solve_ivp
+
+from .seapmdr import prepare_states, prepare_disease_params
+
+
+COMPARTMENTS = ["S", "E0", "E1", "I0", "I1", "I2", "I3", "R", "D"]
+
+
+def mobility_matrix(flows):
+    """
+    Normalize a matrix of travel flows into a row-stochastic mobility matrix.
+
+    Params
+    --------
+    flows: scipy.sparse matrix or array-like
+            Square matrix with the number of residents of each place (rows)
+            that spend their days in each place (columns). Diagonal entries
+            are the residents that stay in their place of origin.
+
+    Returns
+    --------
+    scipy.sparse.csr_matrix
+            Matrix whose rows sum to one, with the proportion of time the
+            residents of each place spend in every other place. Places without
+            any registered flow are assumed to stay at home.
+    """
+
+    flows = sparse.csr_matrix(flows, dtype=float)
+    if flows.shape[0] != flows.shape[1]:
+        raise ValueError("Mobility flows must be a square matrix.")
+
+    totals = np.asarray(flows.sum(axis=1)).ravel()
+    isolated = totals == 0
+    flows = flows + sparse.diags(isolated.astype(float))
+    totals[isolated] = 1
+
+    return sparse.diags(1 / totals) @ flows
+
+
+def synthetic_mobility(n_places, stay_proportion=0.9, n_destinations=4, seed=None):
+    """
+    Generate a random sparse mobility matrix, for testing and benchmarks.
+
+    Params
+    --------
+    n_places: int
+            Number of places in the metapopulation.
+    stay_proportion: float
+            Proportion of time residents spend in their own place.
+    n_destinations: int
+            Number of other places visited by the residents of each place.
+    seed: int or np.random.Generator
+            Seed for the random number generator.
+
+    Returns
+    --------
+    scipy.sparse.csr_matrix
+            Row-stochastic mobility matrix with shape (n_places, n_places).
+    """
+
+    rng = np.random.default_rng(seed)
+    n_destinations = min(n_destinations, n_places - 1)
+    if n_destinations == 0:
+        return sparse.identity(n_places, format="csr")
+
+    # draw destinations by shifting each origin by a random non-zero offset,
+    # so that residents never "travel" to their own place
+    offsets = np.concatenate([
+        rng.choice(np.arange(1, n_places), size=n_destinations, replace=False)
+        for _ in range(n_places)
+    ])
+    origins = np.repeat(np.arange(n_places), n_destinations)
+    destinations = (origins + offsets) % n_places
+
+    travel = mobility_matrix(sparse.csr_matrix(
+        (rng.random(origins.size), (origins, destinations)),
+        shape=(n_places, n_places),
+    ))
+
+    return sparse.csr_matrix(
+        travel * (1 - stay_proportion)
+        + sparse.identity(n_places) * stay_proportion
+    )
+
+
+def prepare_places(population_params, place_specific_params, disease_params, Rt):
+    """
+    Stack the initial states and SEAPMDR parameters of several places.
+
+    Params
+    --------
+    population_params: list of dict
+            Explicit population parameters (N, I, R, D) of each place.
+    place_specific_params: list of dict
+            Place-specific fatality ratio and disease severity distribution
+            of each place.
+    disease_params: dict
+            Fixed epidemiological parameters for the disease.
+    Rt: list of float
+            Effective reproduction number of each place.
+
+    Returns
+    --------
+    tuple
+            Array of initial states with shape (n_compartments, n_places) and
+            a dictionary of model parameters, with one array entry per
+            parameter.
+    """
+
+    places = list(zip(population_params, place_specific_params, Rt))
+    states = [
+        prepare_states(population, place, disease_params, rt)
+        for population, place, rt in places
+    ]
+    y0 = np.array(
+        [[place_states[c] for place_states in states] for c in COMPARTMENTS],
+        dtype=float,
+    )
+
+    rates = [
+        prepare_disease_params(
+            population, place, disease_params, rt, states=place_states
+        )
+        for (population, place, rt), place_states in zip(places, states)
+    ]
+    model_params = {
+        param: np.array([place_rates[param] for place_rates in rates])
+        for param in rates[0].keys()
+    }
+    model_params["N"] = np.array(
+        [population["N"] for population in population_params], dtype=float
+    )
+
+    return y0, model_params
+
+
+def SEAPMDR_meta(t, y, model_params, mobility=None):
+    """
+    The SEAPMDR model differential equations, for several places coupled by
+    the daily mobility of their residents.
+
+    Residents of each place carry their community infectiousness (E1, I0 and
+    I1) to the places they visit, where it is mixed with the visitors from
+    every other place. Hospitalized cases (I2 and I3) only transmit in their
+    place of residence. Without mobility (or with an identity matrix), this is
+    equivalent to running `seapmdr.SEAPMDR` independently for each place.
+
+    Params
+    --------
+    t: float
+            Current time (unused; the system is autonomous).
+    y: np.array
+            Flattened array of states with shape (n_compartments * n_places,),
+            in the order given by `COMPARTMENTS`.
+    model_params: dict
+            Arrays of transmission, progression, recovery and death rates for
+            each place, as returned by `prepare_places`.
+    mobility: scipy.sparse.csr_matrix
+            Row-stochastic mobility matrix, as returned by `mobility_matrix`.
+
+    Return
+    -------
+    np.array
+            Flattened derivatives of the states.
+    """
+
+    S, E0, E1, I0, I1, I2, I3, R, D = y.reshape(len(COMPARTMENTS), -1)
+
+    community = (
+        (model_params["betaE"] * E1)
+        + (model_params["beta0"] * I0)
+        + (model_params["beta1"] * I1)
+    )
+    hospital = (model_params["beta2"] * I2) + (model_params["beta3"] * I3)
+
+    if mobility is not None:
+        # infectiousness brought to each place by its visitors, diluted
+        # amongst everyone present there during the day
+        visited = (mobility.T @ (community * model_params["N"])) / (
+            model_params["N_present"]
+        )
+        community = mobility @ visited
+
+    # Exposition of susceptible rate
+    exposition_rate = (community + hospital) * S
+
+    dSdt = -exposition_rate
+    dE0dt = exposition_rate - model_params["sigma0"] * E0
+    dE1dt = model_params["sigma0"] * E0 - model_params["sigma1"] * E1
+    dI0dt = (
+        model_params["sigma1"] * E1 * model_params["phi"]
+        - model_params["gamma0"] * I0
+    )
+    dI1dt = (
+        model_params["sigma1"] * E1 * (1 - model_params["phi"])
+        - (model_params["gamma1"] + model_params["p1"]) * I1
+    )
+    dI2dt = model_params["p1"] * I1 - (model_params["gamma2"] + model_params["p2"]) * I2
+    dI3dt = model_params["p2"] * I2 - (model_params["gamma3"] + model_params["mu"]) * I3
+    dRdt = (
+        model_params["gamma0"] * I0
+        + model_params["gamma1"] * I1
+        + model_params["gamma2"] * I2
+        + model_params["gamma3"] * I3
+    )
+    dDdt = model_params["mu"] * I3
+
+    return np.concatenate(
+        [dSdt, dE0dt, dE1dt, dI0dt, dI1dt, dI2dt, dI3dt, dRdt, dDdt]
+    )
+
+
+def solve(y0, model_params, n_days, mobility=None, method="RK45"):
+    """
+    Integrate the coupled SEAPMDR system for all places at once.
+
+    An explicit solver is used by default: implicit methods (such as the
+    LSODA used by `odeint`) build dense Jacobians that do not fit in memory
+    for thousands of places.
+
+    Params
+    --------
+    y0: np.array
+            Initial states with shape (n_compartments, n_places).
+    model_params: dict
+            Model parameters, as returned by `prepare_places`.
+    n_days: int
+            Number of days to project (at least one).
+    mobility: scipy.sparse matrix
+            Row-stochastic mobility matrix. If None, places are independent.
+    method: str
+            Integration method passed to `scipy.integrate.solve_ivp`.
+
+    Returns
+    --------
+    np.array
+            Daily states with shape (n_days + 1, n_compartments, n_places).
+    """
+
+    if n_days < 1:
+        raise ValueError(f"n_days must be at least 1, got {n_days}.")
+
+    if mobility is not None:
+        mobility = sparse.csr_matrix(mobility)
+        if mobility.shape != (y0.shape[1], y0.shape[1]):
+            raise ValueError(
+                "Mobility matrix shape does not match the number of places."
+            )
+        N_present = mobility.T @ model_params["N"]
+        model_params = {
+            **model_params, "N_present": np.where(N_present > 0, N_present, 1)
+        }
+
+    t = np.arange(n_days + 1)
+    result = solve_ivp(
+        SEAPMDR_meta,
+        (0, n_days),
+        y0.ravel(),
+        method=method,
+        t_eval=t,
+        args=(model_params, mobility),
+        rtol=1e-6,
+        atol=1e-6,
+    )
+    if not result.success:
+        raise RuntimeError(f"Integration failed: {result.message}")
+
+    return result.y.T.reshape(len(t), *y0.shape)
+
+
+def entrypoint(
+    population_params,
+    place_specific_params,
+    disease_params,
+    phase,
+    mobility=None,
+    place_ids=None,
+):
+    """
+    Function to receive user input and run the metapopulation model.
+
+    Params
+    --------
+    population_params: list of dict
+         Population parameters (N, I, R, D) of each place.
+
+    place_specific_params: list of dict
+        Parameters for specific places, in the same order.
+
+    disease_params: dict
+        Parameters of model dynamic (transmission, progression, recovery and death rates)
+
+    phase: dict
+       Scenario and days to run
+            - scenario
+            - R0: list with the reproduction number of each place
+            - n_days
+
+    mobility: scipy.sparse matrix
+        Row-stochastic matrix of the time the residents of each place spend
+        in the other places. If None, places are simulated independently.
+
+    place_ids: list
+        Identifiers of the places. Defaults to their positions.
+
+    Return
+    -------
+    pd.DataFrame
+            Evolution of population parameters, indexed by place and day.
+    """
+
+    y0, model_params = prepare_places(
+        population_params, place_specific_params, disease_params, phase["R0"]
+    )
+    states = solve(y0, model_params, phase["n_days"], mobility=mobility)
+
+    n_days, n_places = states.shape[0], states.shape[2]
+    if place_ids is None:
+        place_ids = np.arange(n_places)
+
+    result = pd.DataFrame(
+        states.transpose(2, 0, 1).reshape(-1, len(COMPARTMENTS)),
+        columns=COMPARTMENTS,
+        index=pd.MultiIndex.from_product(
+            [place_ids, np.arange(n_days)], names=["place_id", "dias"]
+        ),
+    )
+    result["N"] = result.sum(axis=1)
+    result["E"] = result["E0"] + result["E1"]
+    result["scenario"] = phase["scenario"]
+
+    return result
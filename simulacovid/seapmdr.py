@@ -125,7 +125,12 @@ def prepare_states(
 
 
 def prepare_disease_params(
-    population_params, place_specific_params, disease_params, Rt
+    population_params,
+    place_specific_params,
+    disease_params,
+    Rt,
+    states=None,
+    verbose=False,
 ):
     """
     Estimate non explicity SEAPMDR model parameters
@@ -136,6 +141,11 @@ def prepare_disease_params(
     place_specific_params: dict
     disease_params: dict
     Rt: int
+    states: dict
+            Initial states already estimated by `prepare_states` for the
+            same inputs (calculated here if not given).
+    verbose: bool
+            Print the derived transmission rates.
 
     Returns
     --------
@@ -143,12 +153,14 @@ def prepare_disease_params(
            Explicit and implicit disease parameters ready to be applied in the `model` function
     """
 
-    population_params = prepare_states(
-        population_params,
-        place_specific_params,
-        disease_params,
-        Rt,
-    )
+    if states is None:
+        states = prepare_states(
+            population_params,
+            place_specific_params,
+            disease_params,
+            Rt,
+        )
+    population_params = states
 
     frac_mild_to_severe = place_specific_params["i2_percentage"] / (
         place_specific_params["i1_percentage"] + place_specific_params["i2_percentage"]
@@ -244,11 +256,12 @@ def prepare_disease_params(
     beta_0 = beta_E
     beta_1 = beta_E
 
-    print(
-        f"Rt: {Rt}\nAverage infectious period: {t_avg}\nNosocomial prop.: " +
-        f"{nosocomial_prop}\nBeta E, 0, 1: {beta_E}\nBeta 2, 3: {beta_2}\n" +
-        "--------------------------------------------"
-    )
+    if verbose:
+        print(
+            f"Rt: {Rt}\nAverage infectious period: {t_avg}\nNosocomial prop.: " +
+            f"{nosocomial_prop}\nBeta E, 0, 1: {beta_E}\nBeta 2, 3: {beta_2}\n" +
+            "--------------------------------------------"
+        )
 
     # make betas per capita and add to parameters
     N = sum(
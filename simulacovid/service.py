@@ -0,0 +1,366 @@
+import asyncio
+import functools
+import json
+import math
+import multiprocessing
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+import pandas as pd
+
+from . import prepare, metapopulation
+
+
+class TTLCache:
+    """
+    Least-recently-used cache whose entries expire after a fixed time.
+
+    Params
+    --------
+    maxsize: int
+            Maximum number of entries kept.
+    ttl: float
+            Time, in seconds, an entry remains valid.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _solve_batch(rows, place_id, config, place_specific_params, rts, n_days):
+    """
+    Prepares and solves the projections of several places in a single
+    vectorized integration (run in a worker process).
+
+    Returns a list with, for each place, either a dictionary of daily
+    compartment values or the error message explaining why the place could
+    not be projected.
+    """
+
+    results = [None] * len(rows)
+    population_params, places_params, place_rts, solvable = [], [], [], []
+
+    for i, (row, rt) in enumerate(zip(rows, rts)):
+        # a place with broken data must not fail the others in its batch
+        try:
+            params = prepare.prepare_simulation(
+                row, place_id, config, place_specific_params
+            )
+        except KeyError:
+            params = None
+        except Exception as error:
+            results[i] = f"Place could not be prepared for a projection: {error}"
+            continue
+        if not isinstance(params, dict):
+            results[i] = "Place has no data for a projection."
+            continue
+        population_params.append(params["population_params"])
+        places_params.append(params["place_specific_params"])
+        place_rts.append(params["R0"]["best"] if rt is None else rt)
+        solvable.append(i)
+
+    if not solvable:
+        return results
+    y0, model_params = metapopulation.prepare_places(
+        population_params,
+        places_params,
+        config["br"]["seir_parameters"],
+        place_rts,
+    )
+
+    # inconsistent inputs (e.g. more recovered than inhabitants) leave no
+    # susceptibles and would break the integration of the whole batch
+    consistent = [j for j in range(len(solvable)) if y0[0, j] >= 0]
+    for j in set(range(len(solvable))) - set(consistent):
+        results[solvable[j]] = "Place has inconsistent data for a projection."
+
+    if consistent:
+        states = metapopulation.solve(
+            y0[:, consistent],
+            {param: values[consistent] for param, values in model_params.items()},
+            n_days,
+        )
+
+    for k, j in enumerate(consistent):
+        results[solvable[j]] = {
+            compartment: states[:, c, k].tolist()
+            for c, compartment in enumerate(metapopulation.COMPARTMENTS)
+        }
+        results[solvable[j]]["rt"] = float(place_rts[j])
+
+    return results
+
+
+class ProjectionService:
+    """
+    Asynchronous front-end to the SEAPMDR engine.
+
+    Identical requests that arrive while a projection is being solved share
+    its result; different places requested within `batch_window` seconds are
+    solved together by a worker process; and results are kept in a TTL cache.
+
+    Params
+    --------
+    config: dict
+            Configuration dictionary (`custom_configs.yaml`).
+    farol: pd.DataFrame
+            Farol history; the most recent row of each place is used as the
+            starting point of its projections.
+    place_specific_params: pd.DataFrame
+            Place-specific parameters, indexed by `place_id`.
+    place_id: str
+            Place level of the projections [ health_region_id | state_num_id ].
+    date_col: str
+            Column with the date of each Farol row.
+    executor: concurrent.futures.Executor
+            Pool where batches are solved. Defaults to a pool of spawned
+            processes.
+    batch_window: float
+            Time, in seconds, to wait for other requests before solving.
+    cache_ttl: float
+            Time, in seconds, results remain cached.
+    cache_size: int
+            Maximum number of cached results.
+    max_days: int
+            Longest projection, in days, accepted from HTTP requests.
+    """
+
+    def __init__(
+        self,
+        config,
+        farol,
+        place_specific_params,
+        place_id="state_num_id",
+        date_col="last_updated_cases",
+        executor=None,
+        batch_window=0.005,
+        cache_ttl=300,
+        cache_size=1024,
+        max_days=365,
+    ):
+        self.config = config
+        self.place_id = place_id
+        self.place_specific_params = place_specific_params
+        self.rows = (
+            farol.sort_values(date_col)
+            .drop_duplicates(place_id, keep="last")
+            .set_index(place_id, drop=False)
+        )
+        # spawned (not forked) workers, so they do not inherit open sockets
+        self.executor = executor or ProcessPoolExecutor(
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        self.batch_window = batch_window
+        self.max_days = max_days
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "solves": 0}
+        self._inflight = {}
+        self._pending = []
+        self._flush_handle = None
+        # running solves, referenced until done so they are not collected
+        self._tasks = set()
+
+    async def project(self, place, rt=None, n_days=90):
+        """
+        Project a place for `n_days`, with its most likely Rt or a given one.
+
+        Returns
+        --------
+        dict
+                Daily values of each compartment, and the Rt used.
+        """
+
+        self.stats["requests"] += 1
+        if place not in self.rows.index:
+            raise KeyError(f"Unknown place: {place}")
+        key = (place, None if rt is None else round(float(rt), 4), int(n_days))
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self._pending.append(key)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.batch_window, self._flush
+            )
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        self._flush_handle = None
+        pending, self._pending = self._pending, []
+
+        # each batch must share the same horizon
+        batches = {}
+        for key in pending:
+            batches.setdefault(key[2], []).append(key)
+        for n_days, keys in batches.items():
+            task = asyncio.ensure_future(self._solve(keys, n_days))
+            self._tasks.add(task)
+            task.add_done_callback(functools.partial(self._solve_done, keys))
+
+    def _solve_done(self, keys, task):
+        self._tasks.discard(task)
+        if task.cancelled():
+            error = asyncio.CancelledError()
+        elif task.exception() is not None:
+            error = task.exception()
+        else:
+            return
+        # fail the requests the solve could not answer, instead of leaving
+        # them waiting forever
+        for key in keys:
+            future = self._inflight.pop(key, None)
+            if future is not None and not future.done():
+                future.set_exception(error)
+
+    async def _solve(self, keys, n_days):
+        self.stats["solves"] += 1
+        places = [place for place, _, _ in keys]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                _solve_batch,
+                [self.rows.loc[place] for place in places],
+                self.place_id,
+                self.config,
+                self.place_specific_params.loc[
+                    self.place_specific_params.index.intersection(places)
+                ],
+                [rt for _, rt, _ in keys],
+                n_days,
+            )
+        except Exception as error:
+            results = [error] * len(keys)
+
+        for key, result in zip(keys, results):
+            future = self._inflight.pop(key)
+            if isinstance(result, dict):
+                self.cache.set(key, result)
+                future.set_result(result)
+            elif isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_exception(ValueError(result))
+
+    async def handle(self, reader, writer):
+        """Serve HTTP/1.1 requests from a single (keep-alive) connection."""
+
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    # without a valid request line, the connection can not
+                    # be trusted to carry further requests
+                    status, body = "400 Bad Request", {"error": "Malformed request."}
+                    keep_alive = False
+                else:
+                    status, body = await self._route(method, target)
+                    keep_alive = headers.get("connection", "").lower() != "close"
+
+                payload = json.dumps(body).encode()
+                writer.write(
+                    f"HTTP/1.1 {status}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                    "\r\n".encode() + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, target):
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if method != "GET":
+            return "405 Method Not Allowed", {"error": "Only GET is supported."}
+        if url.path == "/stats":
+            return "200 OK", {**self.stats, "cached": len(self.cache)}
+        if url.path != "/projection":
+            return "404 Not Found", {"error": f"Unknown path: {url.path}"}
+
+        try:
+            place = self._parse_place(query["place"])
+            rt = float(query["rt"]) if "rt" in query else None
+            n_days = int(query.get("n_days", 90))
+        except (KeyError, ValueError):
+            return "400 Bad Request", {
+                "error": "Expected `place` and optional numeric `rt` and `n_days`."
+            }
+        if not 1 <= n_days <= self.max_days:
+            return "400 Bad Request", {
+                "error": f"`n_days` must be between 1 and {self.max_days}."
+            }
+        if rt is not None and not (math.isfinite(rt) and rt > 0):
+            return "400 Bad Request", {"error": "`rt` must be positive."}
+
+        try:
+            result = await self.project(place, rt=rt, n_days=n_days)
+        except KeyError as error:
+            return "404 Not Found", {"error": str(error)}
+        except ValueError as error:
+            return "422 Unprocessable Entity", {"error": str(error)}
+        except Exception as error:
+            return "500 Internal Server Error", {"error": str(error)}
+
+        return "200 OK", {"place": query["place"], "n_days": n_days, **result}
+
+    def _parse_place(self, place):
+        # place identifiers may be numeric (e.g. `state_num_id`) or not
+        if pd.api.types.is_numeric_dtype(self.rows.index):
+            return self.rows.index.dtype.type(place)
+        return place
+
+    async def serve(self, host="127.0.0.1", port=8000):
+        """Start listening for HTTP connections."""
+        return await asyncio.start_server(self.handle, host, port)
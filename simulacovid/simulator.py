@@ -7,6 +7,7 @@ from pathlib import Path
 
 from .seir import entrypoint as seir
 from .seapmdr import entrypoint as seapmdr
+from .metapopulation import COMPARTMENTS, prepare_places, solve
 import datetime as dt
 
 
@@ -104,5 +105,201 @@ def run_simulation(params, config, model):
     # return dday
 
 
+def _reproduction_number(model_params, susceptible):
+    """
+    Número de reprodução efetivo realizado pelas equações do SEAPMDR: o
+    número esperado de infecções causadas por um novo infectado, dados os
+    suscetíveis atuais, somando as contribuições de cada compartimento
+    (taxa de transmissão x tempo médio nele x chance de passar por ele).
+    """
+
+    p = model_params
+    critical = p["beta3"] / (p["gamma3"] + p["mu"])
+    severe = (p["beta2"] + p["p2"] * critical) / (p["gamma2"] + p["p2"])
+    mild = (p["beta1"] + p["p1"] * severe) / (p["gamma1"] + p["p1"])
+    per_capita = (
+        p["betaE"] / p["sigma1"]
+        + p["phi"] * p["beta0"] / p["gamma0"]
+        + (1 - p["phi"]) * mild
+    )
+    return per_capita * susceptible
+
+
+def run_adaptive_simulation(
+    params_list,
+    config,
+    scenario="best",
+    questions=("beds", "icu_beds", "peak"),
+    active_threshold=1,
+    max_days=365,
+    block_days=7,
+    place_ids=None,
+):
+    """
+    Roda a projeção SEAPMDR de vários locais de uma só vez, encerrando a
+    integração de cada local assim que as perguntas feitas forem
+    respondidas.
+
+    A integração avança em blocos de `block_days` dias. Ao fim de cada
+    bloco, saem do conjunto ativo os locais cujas perguntas já foram
+    respondidas - o pico de infectados já passou (os infectados estão
+    abaixo do máximo, a incidência diária de novas infecções caiu em todo
+    o bloco e o número de reprodução realizado pelas equações do modelo,
+    com os suscetíveis restantes, está abaixo de 1) e a demanda por leitos
+    já ultrapassou a oferta ou, após o pico, está em queda - e aqueles
+    cujos expostos e infectados caíram abaixo de `active_threshold`.
+    Assim, o horizonte pode ir além dos 90 dias de `run_simulation` sem
+    que o custo acompanhe o local mais demorado.
+
+    Apenas o modelo SEAPMDR é suportado; para o SEIR, use
+    `run_simulation`.
+
+    Params
+    ------
+    params_list : list
+        Dicionários de parâmetros de entrada do simulador (como os
+        retornados por `prepare.prepare_simulation`), um por local.
+    config : Dict
+        Dicionário de configuração com parâmetros fixos.
+    scenario : str
+        Cenário de Rt a utilizar [ best | worst ].
+    questions : tuple
+        Perguntas a responder para cada local [ beds | icu_beds | peak ].
+    active_threshold : float
+        Número de expostos e infectados abaixo do qual a epidemia é
+        considerada encerrada no local.
+    max_days : int
+        Horizonte máximo da projeção.
+    block_days : int
+        Número de dias integrados entre as verificações.
+    place_ids : list
+        Identificadores dos locais. Por padrão, suas posições.
+
+    Returns
+    -------
+    summary : pd.DataFrame
+        Tabela com, para cada local, o dia em que a demanda ultrapassa a
+        oferta de leitos enfermaria e UTI (`dday_beds`, `dday_icu_beds`, na
+        mesma convenção de `get_dday`, com -1 caso não ocorra), o dia e o
+        número de infectados no pico, o número de dias simulados e o motivo
+        da parada [ answered | extinct | max_days ].
+    """
+
+    n_places = len(params_list)
+    if place_ids is None:
+        place_ids = np.arange(n_places)
+
+    rt = np.array([params["R0"][scenario] for params in params_list], dtype=float)
+    y, model_params = prepare_places(
+        [params["population_params"] for params in params_list],
+        [params["place_specific_params"] for params in params_list],
+        config["br"]["seir_parameters"],
+        rt,
+    )
+    susceptible = COMPARTMENTS.index("S")
+    capacity = {
+        "beds": np.array([params["n_beds"] for params in params_list], dtype=float),
+        "icu_beds": np.array(
+            [params["n_icu_beds"] for params in params_list], dtype=float
+        ),
+    }
+    demand = {"beds": COMPARTMENTS.index("I2"), "icu_beds": COMPARTMENTS.index("I3")}
+    infected = [COMPARTMENTS.index(col) for col in ["I0", "I1", "I2", "I3"]]
+    exposed_infected = infected + [COMPARTMENTS.index(col) for col in ["E0", "E1"]]
+
+    dday = {resource: np.full(n_places, -1) for resource in demand}
+    peak_day = np.ones(n_places, dtype=int)
+    peak_infected = y[infected].sum(axis=0)
+    days_simulated = np.zeros(n_places, dtype=int)
+    stop_reason = np.full(n_places, "max_days", dtype=object)
+    # new infections on the last simulated day of each place
+    last_incidence = np.full(n_places, np.nan)
+
+    def check(states, active, first_day):
+        # states: (n_days, n_compartments, n_active), for days from first_day
+        for resource, col in demand.items():
+            crossed = states[:, col, :] > capacity[resource][active]
+            new = (dday[resource][active] == -1) & crossed.any(axis=0)
+            dday[resource][active[new]] = (
+                first_day + crossed[:, new].argmax(axis=0) + 1
+            )
+
+        current = states[:, infected, :].sum(axis=1)
+        block_peak = current.max(axis=0)
+        higher = block_peak > peak_infected[active]
+        peak_infected[active[higher]] = block_peak[higher]
+        peak_day[active[higher]] = (
+            first_day + current[:, higher].argmax(axis=0) + 1
+        )
+
+    active = np.arange(n_places)
+    check(y[None, :, :], active, 0)
+
+    day = 0
+    while active.size > 0 and day < max_days:
+        n_days = min(block_days, max_days - day)
+        states = solve(
+            y[:, active],
+            {param: values[active] for param, values in model_params.items()},
+            n_days,
+        )
+        check(states[1:], active, day + 1)
+        day += n_days
+        y[:, active] = states[-1]
+        days_simulated[active] = day
+
+        # peak passed: infections are below the highest level so far, the
+        # daily new infections fell throughout the block (and since the
+        # previous one), and each new infection causes less than one more.
+        # The input Rt is not used here: the rates derived from it may
+        # realize a different reproduction number, and the initial states
+        # may start with a transient dip of new infections
+        incidence = -np.diff(states[:, susceptible, :], axis=0)
+        falling = (np.diff(incidence, axis=0) < 0).all(axis=0) & ~(
+            incidence[0] >= last_incidence[active]
+        )
+        last_incidence[active] = incidence[-1]
+        realized_rt = _reproduction_number(
+            {param: values[active] for param, values in model_params.items()},
+            states[-1][susceptible],
+        )
+        peak_passed = (
+            (states[-1][infected].sum(axis=0) < peak_infected[active])
+            & falling
+            & (realized_rt < 1)
+        )
+
+        answered = np.ones(active.size, dtype=bool)
+        for question in questions:
+            if question == "peak":
+                answered &= peak_passed
+                continue
+            # capacity is either exceeded, unknown, or can no longer be
+            # exceeded (demand going down after the peak of infections)
+            col = demand[question]
+            answered &= (
+                (dday[question][active] != -1)
+                | np.isnan(capacity[question][active])
+                | (peak_passed & (states[-1][col] < states[-2][col]))
+            )
+        extinct = states[-1][exposed_infected].sum(axis=0) < active_threshold
+
+        stop_reason[active[answered]] = "answered"
+        stop_reason[active[extinct & ~answered]] = "extinct"
+        active = active[~(answered | extinct)]
+
+    return pd.DataFrame(
+        {
+            "dday_beds": dday["beds"],
+            "dday_icu_beds": dday["icu_beds"],
+            "peak_day": peak_day,
+            "peak_infected": peak_infected,
+            "days_simulated": days_simulated,
+            "stop_reason": stop_reason,
+        },
+        index=pd.Index(place_ids, name="place_id"),
+    )
+
+
 if __name__ == "__main__":
     pass
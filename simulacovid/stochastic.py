@@ -0,0 +1,203 @@
+import pandas as pd
+import numpy as np
+
+from .metapopulation import COMPARTMENTS, prepare_places
+
+
+def _leave(rng, population, rate, dt):
+    """Draw how many individuals leave a compartment during a step."""
+    return rng.binomial(population, -np.expm1(-rate * dt))
+
+
+def _step(rng, y, model_params, dt):
+    """
+    Advance all replicates of all places by one tau-leaping step.
+
+    Params
+    --------
+    y: np.array
+            Integer states with shape (n_compartments, n_replicates, n_places),
+            updated in place.
+    """
+
+    S, E0, E1, I0, I1, I2, I3, R, D = y
+    p = model_params
+
+    exposition_rate = (
+        p["betaE"] * E1 + p["beta0"] * I0 + p["beta1"] * I1
+        + p["beta2"] * I2 + p["beta3"] * I3
+    )
+    infected = _leave(rng, S, exposition_rate, dt)
+    latent_out = _leave(rng, E0, p["sigma0"], dt)
+    presymptomatic_out = _leave(rng, E1, p["sigma1"], dt)
+    asymptomatic = rng.binomial(presymptomatic_out, p["phi"])
+    asymptomatic_out = _leave(rng, I0, p["gamma0"], dt)
+
+    # competing outcomes: leave at the total rate, then split by their odds
+    mild_out = _leave(rng, I1, p["gamma1"] + p["p1"], dt)
+    mild_to_severe = rng.binomial(mild_out, p["p1"] / (p["gamma1"] + p["p1"]))
+    severe_out = _leave(rng, I2, p["gamma2"] + p["p2"], dt)
+    severe_to_critical = rng.binomial(severe_out, p["p2"] / (p["gamma2"] + p["p2"]))
+    critical_out = _leave(rng, I3, p["gamma3"] + p["mu"], dt)
+    critical_to_death = rng.binomial(critical_out, p["mu"] / (p["gamma3"] + p["mu"]))
+
+    S -= infected
+    E0 += infected - latent_out
+    E1 += latent_out - presymptomatic_out
+    I0 += asymptomatic - asymptomatic_out
+    I1 += presymptomatic_out - asymptomatic - mild_out
+    I2 += mild_to_severe - severe_out
+    I3 += severe_to_critical - critical_out
+    R += (
+        asymptomatic_out
+        + (mild_out - mild_to_severe)
+        + (severe_out - severe_to_critical)
+        + (critical_out - critical_to_death)
+    )
+    D += critical_to_death
+
+
+def entrypoint(
+    population_params,
+    place_specific_params,
+    disease_params,
+    phase,
+    n_replicates=1000,
+    steps_per_day=12,
+    icu_capacity=None,
+    quantiles=(0.05, 0.5, 0.95),
+    compartments=("I2", "I3", "D"),
+    place_ids=None,
+    seed=None,
+):
+    """
+    Run replicates of a stochastic (tau-leaping) version of the SEAPMDR
+    model, for small populations where the deterministic trajectories hide
+    the chance of the epidemic dying out or exploding.
+
+    Transitions use the same rates as `seapmdr.SEAPMDR` (derived by
+    `seapmdr.prepare_disease_params`), with binomial draws for the number of
+    individuals leaving each compartment in each step. All replicates of all
+    places are advanced together as integer arrays, and only the daily
+    quantiles and per-replicate flags are kept, not the full paths.
+
+    Params
+    --------
+    population_params: list of dict
+         Population parameters (N, I, R, D) of each place.
+
+    place_specific_params: list of dict
+        Parameters for specific places, in the same order.
+
+    disease_params: dict
+        Parameters of model dynamic (transmission, progression, recovery and death rates)
+
+    phase: dict
+       Scenario and days to run
+            - scenario
+            - R0: list with the reproduction number of each place
+            - n_days
+
+    n_replicates: int
+        Number of replicates for each place.
+
+    steps_per_day: int
+        Number of tau-leaping steps per day. Individuals entering a
+        compartment only leave it in the next step, which slightly lengthens
+        the infectious period; the bias falls with the step size (with 12
+        steps, active cases at 90 days stay within ~10% of the
+        deterministic model).
+
+    icu_capacity: list of float
+        ICU beds available in each place. If given, the probability of the
+        critical cases (I3) exceeding it is calculated.
+
+    quantiles: tuple
+        Quantiles of the compartments to report for each day.
+
+    compartments: tuple
+        Compartments to report quantiles for.
+
+    place_ids: list
+        Identifiers of the places. Defaults to their positions.
+
+    seed: int or np.random.Generator
+        Seed for the random number generator.
+
+    Return
+    -------
+    dict
+        - quantiles: pd.DataFrame with the daily quantiles of each
+          compartment, indexed by place, day and quantile.
+        - summary: pd.DataFrame with, for each place, the probability of
+          extinction (no exposed or infected individuals left at the end),
+          of an outbreak (more infected individuals at the end than at the
+          start) and, if `icu_capacity` was given, of exceeding ICU capacity
+          at any day.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    y0, model_params = prepare_places(
+        population_params, place_specific_params, disease_params, phase["R0"]
+    )
+    n_places = y0.shape[1]
+    # e.g. more recovered and dead than inhabitants, which binomial draws
+    # can not represent
+    inconsistent = np.flatnonzero((np.rint(y0) < 0).any(axis=0))
+    if inconsistent.size:
+        raise ValueError(
+            f"Places with negative initial compartments: {inconsistent.tolist()}"
+        )
+    if place_ids is None:
+        place_ids = np.arange(n_places)
+
+    y = np.repeat(
+        np.rint(y0).astype(np.int64)[:, None, :], n_replicates, axis=1
+    )
+    infected = slice(COMPARTMENTS.index("E0"), COMPARTMENTS.index("I3") + 1)
+    initial_infected = y[COMPARTMENTS.index("I0"):COMPARTMENTS.index("I3") + 1].sum(
+        axis=0
+    )
+    selected = [COMPARTMENTS.index(compartment) for compartment in compartments]
+    icu = COMPARTMENTS.index("I3")
+
+    if icu_capacity is not None:
+        icu_capacity = np.asarray(icu_capacity, dtype=float)
+        icu_exceeded = y[icu] > icu_capacity
+
+    daily = np.empty((phase["n_days"] + 1, len(quantiles), len(selected), n_places))
+    daily[0] = np.quantile(y[selected], quantiles, axis=1)
+
+    dt = 1 / steps_per_day
+    for day in range(1, phase["n_days"] + 1):
+        for _ in range(steps_per_day):
+            _step(rng, y, model_params, dt)
+        daily[day] = np.quantile(y[selected], quantiles, axis=1)
+        if icu_capacity is not None:
+            icu_exceeded |= y[icu] > icu_capacity
+
+    final_infected = y[COMPARTMENTS.index("I0"):COMPARTMENTS.index("I3") + 1].sum(
+        axis=0
+    )
+    summary = pd.DataFrame(
+        {
+            "extinction_probability": (y[infected].sum(axis=0) == 0).mean(axis=0),
+            "outbreak_probability": (final_infected > initial_infected).mean(axis=0),
+        },
+        index=pd.Index(place_ids, name="place_id"),
+    )
+    if icu_capacity is not None:
+        summary["icu_exceeded_probability"] = icu_exceeded.mean(axis=0)
+    summary["scenario"] = phase["scenario"]
+
+    result = pd.DataFrame(
+        daily.transpose(3, 0, 1, 2).reshape(-1, len(selected)),
+        columns=list(compartments),
+        index=pd.MultiIndex.from_product(
+            [place_ids, np.arange(phase["n_days"] + 1), list(quantiles)],
+            names=["place_id", "dias", "quantile"],
+        ),
+    )
+
+    return {"quantiles": result, "summary": summary}
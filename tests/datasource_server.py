@@ -0,0 +1,54 @@
+"""
+Local stand-in of the coronacidades API, used by the datasource tests and
+by `benchmarks/datasource_startup.py`.
+"""
+
+import hashlib
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def stand_in_server(payload, latency=0):
+    """
+    Serve `payload` as CSV on every path, with ETag and Last-Modified
+    validators, on a free local port.
+
+    The returned server counts the requests it answered with each status in
+    `server.responses`.
+    """
+
+    etag = '"' + hashlib.sha1(payload).hexdigest() + '"'
+    last_modified = formatdate(usegmt=True)
+    responses = {200: 0, 304: 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            status = 304 if self.headers.get("If-None-Match") == etag else 200
+            with lock:
+                responses[status] += 1
+
+            self.send_response(status)
+            self.send_header("ETag", etag)
+            if status == 304:
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(payload)))
+            self.send_header("Last-Modified", last_modified)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.responses = responses
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
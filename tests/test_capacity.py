@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulacovid.capacity import RESOURCES, dday_grid, stack_trajectories
+from simulacovid.simulator import get_dday
+
+
+@pytest.fixture
+def trajectories():
+    rng = np.random.default_rng(0)
+    days = pd.RangeIndex(1, 91, name="dias")
+    trajectories = {}
+    for place in ["AC", "RJ", "SP"]:
+        trajectories[place] = {}
+        for scenario in ["worst", "best"]:
+            # demand rising and falling, so the first shortage is not the peak
+            demand = 100 * np.sin(np.linspace(0, 3, len(days))) + rng.normal(
+                0, 5, len(days)
+            ) + 50
+            trajectories[place][scenario] = pd.DataFrame(
+                {"I2": np.round(demand), "I3": np.round(demand / 4)}, index=days
+            )
+    return trajectories
+
+
+def test_grid_matches_get_dday(trajectories):
+    capacity = pd.DataFrame(
+        {"number_beds": [120, 200, np.nan], "number_icu_beds": [40, 30, 500]},
+        index=["AC", "RJ", "SP"],
+    )
+    # a level that ties with a demand value must not count as a shortage
+    capacity.loc["AC", "number_beds"] = trajectories["AC"]["best"]["I2"].max()
+    proportions, added_beds = (0.3, 0.5, 1.0), (0, 10, 100)
+
+    grid = dday_grid(
+        stack_trajectories(trajectories),
+        capacity,
+        proportions=proportions,
+        added_beds=added_beds,
+    ).set_index(["resource", "place_id", "scenario", "proportion", "added_beds"])
+
+    for resource, col in RESOURCES.items():
+        for place, dfs in trajectories.items():
+            for proportion in proportions:
+                for added in added_beds:
+                    level = capacity.loc[place, resource] * proportion + added
+                    expected = (
+                        {"worst": -1, "best": -1} if np.isnan(level)
+                        else get_dday(dfs, col, level)
+                    )
+                    for scenario, dday in expected.items():
+                        assert grid.loc[
+                            (resource, place, scenario, proportion, added), "dday"
+                        ] == dday
+
+
+def test_single_resource(trajectories):
+    grid = dday_grid(
+        stack_trajectories(trajectories),
+        pd.DataFrame({"number_icu_beds": [1, 2, 3]}, index=["AC", "RJ", "SP"]),
+    )
+
+    assert grid["resource"].unique().tolist() == ["number_icu_beds"]
+    assert len(grid) == 3 * 2 * 4
+
+
+def test_capacity_without_resources(trajectories):
+    with pytest.raises(ValueError, match="number_beds"):
+        dday_grid(stack_trajectories(trajectories), pd.DataFrame(index=["AC"]))
@@ -0,0 +1,161 @@
+import gzip
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulacovid.cases import ingest_cases
+
+
+CONFIG = {
+    "br": {
+        "cases": {
+            "rename": {
+                "city_ibge_code": "city_id",
+                "city": "city_name",
+                "state": "state_id",
+                "date": "last_updated",
+                "last_available_deaths": "deaths",
+                "last_available_confirmed": "confirmed_cases",
+                "new_confirmed": "daily_cases",
+                "daily_cases_sum": "infectious_period_cases",
+            },
+            "notification_window_days": 7,
+        }
+    }
+}
+
+CITIES = {3550308: "SP", 3304557: "RJ", 3509502: "SP"}
+
+
+@pytest.fixture
+def cases():
+    """Small `caso_full` table: three cities and one state row per day."""
+
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2020-06-01", periods=20)
+    rows = []
+    for city, state in CITIES.items():
+        # a city that only starts reporting later
+        start = 5 if city == 3509502 else 0
+        new_confirmed = rng.integers(0, 50, len(dates))
+        for i, date in enumerate(dates[start:], start):
+            rows.append({
+                "city": f"city {city}",
+                "city_ibge_code": city,
+                "date": date.strftime("%Y-%m-%d"),
+                "place_type": "city",
+                "state": state,
+                "last_available_confirmed": new_confirmed[start:i + 1].sum(),
+                "last_available_deaths": (i - start) // 3,
+                "new_confirmed": new_confirmed[i],
+            })
+    for date in dates:
+        rows.append({
+            "city": None,
+            "city_ibge_code": 35,
+            "date": date.strftime("%Y-%m-%d"),
+            "place_type": "state",
+            "state": "SP",
+            "last_available_confirmed": 0,
+            "last_available_deaths": 0,
+            "new_confirmed": 0,
+        })
+    return pd.DataFrame(rows).sort_values(["date", "city_ibge_code"])
+
+
+def _write_member(path, rows, header, mode="wb"):
+    with gzip.open(path, mode) as f:
+        f.write(rows.to_csv(index=False, header=header).encode())
+
+
+def _sorted(df, place_col):
+    return df.sort_values([place_col, "last_updated"]).reset_index(drop=True)
+
+
+def test_incremental_ingestion_matches_full_pass(tmp_path, cases):
+    full_path, path = tmp_path / "full.csv.gz", tmp_path / "caso_full.csv.gz"
+    state_path = tmp_path / "state.pickle"
+    _write_member(full_path, cases, header=True)
+    full = ingest_cases(full_path, CONFIG)
+
+    first = cases["date"] <= "2020-06-12"
+    _write_member(path, cases.loc[first], header=True)
+    before = ingest_cases(path, CONFIG, state_path=state_path)
+
+    # the daily update appends a new gzip member without a header
+    _write_member(path, cases.loc[~first], header=False, mode="ab")
+    after = ingest_cases(path, CONFIG, state_path=state_path)
+
+    for level, place_col in [("city", "city_id"), ("state", "state_id")]:
+        incremental = pd.concat([before[level], after[level]], ignore_index=True)
+        pd.testing.assert_frame_equal(
+            _sorted(incremental, place_col),
+            _sorted(full[level], place_col),
+            check_dtype=False,
+        )
+
+
+def test_state_reporting_late_is_not_filled_ahead(tmp_path, cases):
+    full_path, path = tmp_path / "full.csv.gz", tmp_path / "caso_full.csv.gz"
+    state_path = tmp_path / "state.pickle"
+    health_regions = pd.Series({3550308: 1, 3509502: 1, 3304557: 2})
+    _write_member(full_path, cases, header=True)
+    full = ingest_cases(full_path, CONFIG, health_regions=health_regions)
+
+    # RJ has not published 2020-06-09 yet when the first file is read
+    lagging = (cases["state"] == "RJ") & (cases["date"] == "2020-06-09")
+    first = (cases["date"] <= "2020-06-09") & ~lagging
+    _write_member(path, cases.loc[first], header=True)
+    before = ingest_cases(
+        path, CONFIG, state_path=state_path, health_regions=health_regions
+    )
+    assert before["city"]["last_updated"].loc[
+        before["city"]["state_id"] == "RJ"
+    ].max() == pd.Timestamp("2020-06-08")
+
+    _write_member(path, cases.loc[~first], header=False, mode="ab")
+    after = ingest_cases(
+        path, CONFIG, state_path=state_path, health_regions=health_regions
+    )
+
+    for level, place_col in [
+        ("city", "city_id"),
+        ("health_region", "health_region_id"),
+        ("state", "state_id"),
+    ]:
+        incremental = pd.concat([before[level], after[level]], ignore_index=True)
+        pd.testing.assert_frame_equal(
+            _sorted(incremental, place_col),
+            _sorted(full[level], place_col),
+            check_dtype=False,
+        )
+
+
+def test_replaced_file_only_returns_new_dates(tmp_path, cases):
+    path, state_path = tmp_path / "caso_full.csv.gz", tmp_path / "state.pickle"
+    _write_member(path, cases, header=True)
+    full = ingest_cases(path, CONFIG)
+
+    first = cases["date"] <= "2020-06-12"
+    _write_member(path, cases.loc[first], header=True)
+    ingest_cases(path, CONFIG, state_path=state_path)
+
+    # the file is rewritten, as brasil.io does on each update
+    _write_member(path, cases, header=True)
+    after = ingest_cases(path, CONFIG, state_path=state_path)
+
+    expected = full["city"].loc[full["city"]["last_updated"] > "2020-06-12"]
+    pd.testing.assert_frame_equal(
+        _sorted(after["city"], "city_id"),
+        _sorted(expected, "city_id"),
+        check_dtype=False,
+    )
+
+
+def test_no_new_rows_returns_empty(tmp_path, cases):
+    path, state_path = tmp_path / "caso_full.csv.gz", tmp_path / "state.pickle"
+    _write_member(path, cases, header=True)
+
+    assert ingest_cases(path, CONFIG, state_path=state_path)
+    assert ingest_cases(path, CONFIG, state_path=state_path) == {}
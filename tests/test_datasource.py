@@ -0,0 +1,84 @@
+import pandas as pd
+import pytest
+
+from datasource_server import stand_in_server
+from simulacovid.datasource import DataSourceClient, endpoint_path
+
+
+PAYLOAD = (
+    b"state_num_id,last_updated,active_cases\n"
+    b"35,2020-12-01,100.0\n"
+    b"33,2020-12-02,\n"
+)
+
+CONFIG = {
+    "refresh_rate": 10,
+    "br": {
+        "api": {
+            "external": "http://unused",
+            "endpoints": {"farolcovid": {"state": "br/states/farolcovid/main"}},
+        }
+    },
+}
+
+
+@pytest.fixture
+def server():
+    server = stand_in_server(PAYLOAD)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(server, tmp_path):
+    client = DataSourceClient(
+        CONFIG,
+        base_url=f"http://127.0.0.1:{server.server_address[1]}",
+        cache_dir=tmp_path,
+    )
+    yield client
+    client.close()
+
+
+def test_fetch_types_identifiers_and_dates(server, client):
+    df = client.fetch("farolcovid.state")
+
+    assert server.responses == {200: 1, 304: 0}
+    assert str(df["state_num_id"].dtype) == "Int64"
+    assert pd.api.types.is_datetime64_any_dtype(df["last_updated"])
+    assert df["active_cases"].isna().tolist() == [False, True]
+
+
+def test_fresh_cache_skips_requests(server, client):
+    assert client.fetch_raw("farolcovid.state") == PAYLOAD
+    assert client.fetch_raw("farolcovid.state") == PAYLOAD
+
+    assert server.responses == {200: 1, 304: 0}
+
+
+def test_stale_cache_is_revalidated(server, client):
+    client.fetch_raw("farolcovid.state")
+    client.refresh_rate = 0
+
+    assert client.fetch_raw("farolcovid.state") == PAYLOAD
+    assert server.responses == {200: 1, 304: 1}
+    # nothing but the cache files is left behind
+    assert sorted(path.suffix for path in client.cache_dir.iterdir()) == [
+        ".csv", ".json"
+    ]
+
+
+def test_fetch_many(server, client):
+    frames = client.fetch_many(["farolcovid.state"])
+
+    assert list(frames) == ["farolcovid.state"]
+    assert len(frames["farolcovid.state"]) == 2
+
+
+def test_endpoint_path():
+    endpoints = CONFIG["br"]["api"]["endpoints"]
+
+    assert endpoint_path(endpoints, "farolcovid.state") == "br/states/farolcovid/main"
+    with pytest.raises(KeyError, match="has levels: state"):
+        endpoint_path(endpoints, "farolcovid")
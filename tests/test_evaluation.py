@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulacovid.evaluation import match_outcomes, score_predictions
+
+
+@pytest.fixture
+def predictions():
+    # one SEAPMDR forecast made on 2020-07-01, days 1-3, two scenarios
+    rows = []
+    for scenario, deaths in [("best", [100, 110, 120]), ("worst", [100, 130, 160])]:
+        for days, d in zip([1, 2, 3], deaths):
+            rows.append({
+                "model": "SEAPMDR",
+                "scenario": scenario,
+                "date_prediction": "2020-07-01",
+                "days": days,
+                "state_num_id": 35,
+                "D": d,
+                "I0": 0, "I1": 10, "I2": 5, "I3": 5,
+            })
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def observed():
+    return pd.DataFrame({
+        "state_num_id": 35,
+        "last_updated_cases": ["2020-07-01", "2020-07-02", "2020-07-03"],
+        "deaths": [100, 140, 115],
+        "active_cases": [20, 0, 25],
+    })
+
+
+def test_day_one_is_the_prediction_date(predictions, observed):
+    matched = match_outcomes(predictions, observed)
+
+    best = matched.loc[matched["scenario"] == "best"].sort_values("days")
+    assert best["target_date"].tolist() == list(
+        pd.to_datetime(["2020-07-01", "2020-07-02", "2020-07-03"])
+    )
+    assert best["observed_deaths"].tolist() == [100, 140, 115]
+    assert best["predicted_active_cases"].tolist() == [20, 20, 20]
+
+
+def test_zero_based_days(predictions, observed):
+    matched = match_outcomes(
+        predictions.assign(days=predictions["days"] - 1), observed, first_day=0
+    )
+
+    best = matched.loc[matched["scenario"] == "best"].sort_values("days")
+    assert best["observed_deaths"].tolist() == [100, 140, 115]
+
+
+def test_unmatched_days_are_dropped(predictions, observed):
+    matched = match_outcomes(predictions, observed.iloc[:2])
+
+    assert sorted(matched["days"].unique()) == [1, 2]
+
+
+def test_scores(predictions, observed):
+    matched = match_outcomes(predictions, observed)
+    scores = score_predictions(matched, by=["model", "days"])
+
+    deaths = scores.loc["deaths"].reset_index().set_index("days")
+    assert deaths["mae"].tolist() == [0, 30, 5]
+    np.testing.assert_allclose(deaths["mape"], [0, 30 / 140, 5 / 115])
+    # observed within [best, worst]: 100 in [100, 100], 140 outside
+    # [110, 130], 115 outside [120, 160]
+    assert deaths["coverage"].tolist() == [1, 0, 0]
+
+    # a zero observation has no percentage error, but still counts for MAE
+    active = scores.loc["active_cases"].reset_index().set_index("days")
+    assert active["mae"].tolist() == [0, 20, 5]
+    assert np.isnan(active.loc[2, "mape"])
+    assert active["n"].tolist() == [1, 1, 1]
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulacovid import hierarchy
+from simulacovid.metapopulation import COMPARTMENTS
+
+
+def _places():
+    # cities out of order, with a repeated row, as in a joined table
+    return pd.DataFrame(
+        {
+            "city_id": [7, 3, 5, 1, 9, 2, 3],
+            "health_region_id": [20, 10, 11, 10, 21, 11, 10],
+            "state_num_id": [2, 1, 1, 1, 2, 1, 1],
+        }
+    )
+
+
+def _states(n_children, n_days=11, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, 100, size=(n_days, len(COMPARTMENTS), n_children))
+
+
+@pytest.mark.parametrize("coarse", ["health_region_id", "state_num_id"])
+def test_aggregate_matches_groupby_sum(coarse):
+    places = _places()
+    tree = hierarchy.build_hierarchy(places)
+    cities = tree["ids"]["city_id"]
+    states = _states(len(cities))
+
+    # block_days not dividing n_days, so the last block is partial
+    result = hierarchy.aggregate(
+        states, tree["matrices"][("city_id", coarse)], block_days=4
+    )
+
+    parents = places.drop_duplicates("city_id").set_index("city_id")[coarse]
+    frame = hierarchy.to_frame(states, cities, COMPARTMENTS, "city_id")
+    expected = (
+        frame.assign(**{coarse: parents.loc[frame.index.get_level_values(0)].values})
+        .groupby([coarse, "dias"])[COMPARTMENTS]
+        .sum()
+    )
+    pd.testing.assert_frame_equal(
+        hierarchy.to_frame(result, tree["ids"][coarse], COMPARTMENTS, coarse),
+        expected,
+        check_index_type=False,
+    )
+
+
+def test_reconciled_children_add_up_to_parents():
+    tree = hierarchy.build_hierarchy(_places())
+    matrix = tree["matrices"][("city_id", "state_num_id")]
+    children = _states(matrix.shape[1], seed=1)
+    parents = _states(matrix.shape[0], seed=2)
+    # a day and compartment where the children of the first state are zero
+    children[3, 0, matrix[0].indices] = 0
+
+    result = hierarchy.reconcile(children, parents, matrix, block_days=4)
+
+    summed = hierarchy.aggregate(result, matrix)
+    expected = parents.copy()
+    expected[3, 0, 0] = 0
+    np.testing.assert_allclose(summed, expected)
+    # each child keeps its share of its parent's total
+    parent = matrix.toarray().argmax(axis=0)
+    with np.errstate(invalid="ignore"):
+        shares = children / hierarchy.aggregate(children, matrix)[..., parent]
+        reconciled_shares = result / summed[..., parent]
+    np.testing.assert_allclose(reconciled_shares, shares)
+
+
+def test_place_with_two_parents_raises():
+    places = pd.concat(
+        [
+            _places(),
+            pd.DataFrame(
+                {"city_id": [5], "health_region_id": [10], "state_num_id": [1]}
+            ),
+        ]
+    )
+
+    with pytest.raises(ValueError, match=r"`city_id` with more than one.*\[5\]"):
+        hierarchy.build_hierarchy(places)
+
+
+def test_place_without_identifier_raises():
+    places = _places().astype({"health_region_id": float})
+    places.loc[2, "health_region_id"] = np.nan
+
+    with pytest.raises(ValueError, match="health_region_id"):
+        hierarchy.build_hierarchy(places)
@@ -0,0 +1,96 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from simulacovid.history import convert_history, read_history
+
+
+CSV = Path(__file__).resolve().parents[1] / "data" / "br-states-farolcovid-history.csv"
+
+
+@pytest.fixture(scope="module")
+def farol():
+    df = pd.read_csv(CSV)
+    return df.assign(last_updated_cases=pd.to_datetime(df["last_updated_cases"]))
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    return convert_history(CSV, tmp_path_factory.mktemp("history"))
+
+
+def _expected(farol, places, start, end, columns):
+    rows = farol.loc[
+        farol["state_id"].isin(places)
+        & (farol["last_updated_cases"] >= start)
+        & (farol["last_updated_cases"] <= end)
+    ]
+    # places in the requested order, rows of each place by date
+    rows = rows.assign(
+        order=rows["state_id"].map({place: i for i, place in enumerate(places)})
+    ).sort_values(["order", "last_updated_cases"], kind="stable")
+    return rows[["state_id", "last_updated_cases", *columns]].reset_index(drop=True)
+
+
+def test_round_trip_matches_csv_filtering(farol, store):
+    places = ["SP", "AC", "RJ"]
+    columns = ["active_cases", "deaths", "rt_most_likely", "overall_alert"]
+
+    result = read_history(
+        store, columns=columns, places=places, start="2020-06-01", end="2020-07-15"
+    )
+    expected = _expected(
+        farol, places, pd.Timestamp("2020-06-01"), pd.Timestamp("2020-07-15"), columns
+    )
+
+    assert result["state_id"].unique().tolist() == places
+    # both bounds are inclusive
+    assert result["last_updated_cases"].min() == pd.Timestamp("2020-06-01")
+    assert result["last_updated_cases"].max() == pd.Timestamp("2020-07-15")
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_category_columns(farol, store):
+    columns = ["state_name", "situation_classification"]
+
+    result = read_history(store, columns=columns)
+    expected = _expected(
+        farol,
+        sorted(farol["state_id"].unique()),
+        farol["last_updated_cases"].min(),
+        farol["last_updated_cases"].max(),
+        columns,
+    )
+
+    assert isinstance(result["state_name"].dtype, pd.CategoricalDtype)
+    for column in columns:
+        assert (
+            result[column].astype("string").fillna("<NA>").tolist()
+            == expected[column].astype("string").fillna("<NA>").tolist()
+        )
+
+
+def test_duplicate_rows_are_kept(farol, store):
+    duplicated = farol.loc[
+        farol.duplicated(["state_id", "last_updated_cases"], keep=False)
+    ]
+    assert not duplicated.empty  # the bundled history has repeated days
+
+    place, date = duplicated.iloc[0][["state_id", "last_updated_cases"]]
+    result = read_history(
+        store, columns=["deaths"], places=[place], start=date, end=date
+    )
+
+    assert len(result) == len(
+        duplicated.loc[
+            (duplicated["state_id"] == place)
+            & (duplicated["last_updated_cases"] == date)
+        ]
+    )
+
+
+def test_unknown_columns_and_places(store):
+    with pytest.raises(KeyError, match="not_a_column"):
+        read_history(store, columns=["not_a_column"])
+    assert read_history(store, places=["XX"]).empty
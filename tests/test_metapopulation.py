@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+from scipy import sparse
+
+from simulacovid import metapopulation, seapmdr
+from simulacovid.metapopulation import COMPARTMENTS
+
+
+DISEASE_PARAMS = {
+    "asymptomatic_proportion": 0.3,
+    "asymptomatic_duration": 7,
+    "mild_duration": 8,
+    "severe_duration": 7,
+    "critical_duration": 17,
+    "fatality_ratio": 0.02,
+    "doubling_rate": 1.15,
+    "incubation_period": 5.8,
+    "presymptomatic_period": 2.3,
+    "i0_percentage": 0.3,
+    "i1_percentage": 0.55,
+    "i2_percentage": 0.1,
+    "i3_percentage": 0.05,
+    "infected_health_care_proportion": 0.05,
+}
+
+PLACE_PARAMS = {
+    "fatality_ratio": 0.01,
+    "i0_percentage": 0.3,
+    "i1_percentage": 0.55,
+    "i2_percentage": 0.1,
+    "i3_percentage": 0.05,
+}
+
+POPULATIONS = [
+    {"N": 1e6, "I": 500, "R": 1000, "D": 20},
+    {"N": 3e5, "I": 100, "R": 50, "D": 3},
+    {"N": 5e4, "I": 30, "R": 10, "D": 0},
+]
+
+RTS = [1.3, 0.9, 1.6]
+
+
+def _phase(n_days=30):
+    return {"scenario": "projection_current_rt", "R0": RTS, "n_days": n_days}
+
+
+@pytest.mark.parametrize("mobility", [None, sparse.identity(3, format="csr")])
+def test_independent_places_match_seapmdr(mobility):
+    result = metapopulation.entrypoint(
+        POPULATIONS,
+        [PLACE_PARAMS] * 3,
+        DISEASE_PARAMS,
+        _phase(),
+        mobility=mobility,
+    )
+
+    for place, (population, rt) in enumerate(zip(POPULATIONS, RTS)):
+        expected = seapmdr.entrypoint(
+            population,
+            PLACE_PARAMS,
+            DISEASE_PARAMS,
+            {"scenario": "projection_current_rt", "R0": rt, "n_days": 30},
+            initial=True,
+        )
+        np.testing.assert_allclose(
+            result.loc[place, COMPARTMENTS].to_numpy(),
+            expected[COMPARTMENTS].to_numpy(),
+            rtol=1e-5,
+            atol=1e-3,
+        )
+
+
+def test_population_is_conserved_with_mobility():
+    mobility = metapopulation.synthetic_mobility(3, n_destinations=2, seed=0)
+    y0, model_params = metapopulation.prepare_places(
+        POPULATIONS, [PLACE_PARAMS] * 3, DISEASE_PARAMS, RTS
+    )
+
+    states = metapopulation.solve(y0, model_params, 60, mobility=mobility)
+
+    np.testing.assert_allclose(
+        states.sum(axis=1), np.broadcast_to(y0.sum(axis=0), (61, 3))
+    )
+    # travel spreads the epidemic: places differ from the independent run
+    independent = metapopulation.solve(y0, model_params, 60)
+    assert not np.allclose(states, independent)
+
+
+def test_synthetic_mobility_is_row_stochastic():
+    mobility = metapopulation.synthetic_mobility(50, stay_proportion=0.8, seed=1)
+
+    np.testing.assert_allclose(np.asarray(mobility.sum(axis=1)).ravel(), 1)
+    np.testing.assert_allclose(mobility.diagonal(), 0.8)
+
+
+def test_wrong_mobility_shape_raises():
+    y0, model_params = metapopulation.prepare_places(
+        POPULATIONS, [PLACE_PARAMS] * 3, DISEASE_PARAMS, RTS
+    )
+
+    with pytest.raises(ValueError, match="shape"):
+        metapopulation.solve(y0, model_params, 10, mobility=sparse.identity(2))
+    with pytest.raises(ValueError, match="n_days"):
+        metapopulation.solve(y0, model_params, 0)
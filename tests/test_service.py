@@ -0,0 +1,165 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from simulacovid.service import ProjectionService, TTLCache
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    with open(ROOT / "custom_configs.yaml", "r") as f:
+        config = yaml.load(f, Loader=yaml.FullLoader)
+
+    farol = pd.read_csv(ROOT / "data" / "br-states-farolcovid-history.csv")
+    farol = farol.dropna(subset=["notification_rate", "rt_most_likely"])
+
+    disease_params = config["br"]["seir_parameters"]
+    place_specific_params = pd.DataFrame(
+        {
+            param: disease_params[param]
+            for param in [
+                "i0_percentage",
+                "i1_percentage",
+                "i2_percentage",
+                "i3_percentage",
+            ]
+        },
+        index=pd.Index(farol["state_id"].unique(), name="state_id"),
+    )
+    place_specific_params["fatality_ratio"] = (
+        0.5 * place_specific_params["i3_percentage"]
+    )
+    return config, farol, place_specific_params
+
+
+@pytest.fixture
+def service(inputs):
+    config, farol, place_specific_params = inputs
+    executor = ThreadPoolExecutor(2)
+    service = ProjectionService(
+        config,
+        farol,
+        place_specific_params,
+        place_id="state_id",
+        executor=executor,
+        batch_window=0.01,
+    )
+    yield service
+    executor.shutdown()
+
+
+def test_identical_requests_are_coalesced(service):
+    async def run():
+        return await asyncio.gather(
+            service.project("SP", rt=1.1, n_days=10),
+            service.project("SP", rt=1.1, n_days=10),
+        )
+
+    first, second = asyncio.run(run())
+
+    assert first is second
+    assert service.stats["coalesced"] == 1
+    assert service.stats["solves"] == 1
+    assert len(first["S"]) == 11
+
+
+def test_different_places_share_a_solve(service):
+    async def run():
+        return await asyncio.gather(
+            service.project("SP", n_days=10),
+            service.project("RJ", rt=1.2, n_days=10),
+            service.project("MG", rt=0.9, n_days=10),
+        )
+
+    results = asyncio.run(run())
+
+    assert service.stats["solves"] == 1
+    assert [result["rt"] for result in results[1:]] == [1.2, 0.9]
+    # different horizons are solved separately
+    asyncio.run(service.project("SP", n_days=20))
+    assert service.stats["solves"] == 2
+
+
+def test_broken_place_does_not_fail_its_batch(service):
+    service.rows.loc["RJ", "active_cases"] = np.nan
+
+    async def run():
+        return await asyncio.gather(
+            service.project("SP", n_days=10),
+            service.project("RJ", n_days=10),
+            return_exceptions=True,
+        )
+
+    sp, rj = asyncio.run(run())
+
+    assert service.stats["solves"] == 1
+    assert len(sp["S"]) == 11
+    assert isinstance(rj, ValueError)
+
+
+def test_cached_results_expire(service):
+    service.cache.ttl = 0.05
+
+    asyncio.run(service.project("SP", n_days=10))
+    asyncio.run(service.project("SP", n_days=10))
+    assert service.stats["cache_hits"] == 1
+
+    time.sleep(0.06)
+    asyncio.run(service.project("SP", n_days=10))
+    assert service.stats["solves"] == 2
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+@pytest.mark.parametrize(
+    "target, status",
+    [
+        ("/projection?place=SP&n_days=5", "200 OK"),
+        ("/projection?place=XX", "404 Not Found"),
+        ("/unknown", "404 Not Found"),
+        ("/projection", "400 Bad Request"),
+        ("/projection?place=SP&n_days=0", "400 Bad Request"),
+        ("/projection?place=SP&n_days=1000", "400 Bad Request"),
+        ("/projection?place=SP&rt=-1", "400 Bad Request"),
+        ("/projection?place=SP&rt=abc", "400 Bad Request"),
+    ],
+)
+def test_routes(service, target, status):
+    assert asyncio.run(service._route("GET", target))[0] == status
+
+
+def test_malformed_request_gets_a_response(service):
+    async def run():
+        server = await service.serve(port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GARBAGE\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return response
+
+    response = asyncio.run(run())
+
+    assert response.startswith(b"HTTP/1.1 400 Bad Request")
+    assert b"Connection: close" in response
@@ -0,0 +1,68 @@
+from pathlib import Path
+
+import pytest
+import yaml
+
+from simulacovid import simulator
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+INFECTED = ["I0", "I1", "I2", "I3"]
+
+
+@pytest.fixture(scope="module")
+def config():
+    with open(ROOT / "custom_configs.yaml", "r") as f:
+        return yaml.load(f, Loader=yaml.FullLoader)
+
+
+def _params(config, infected, rt, n_beds, n_icu_beds):
+    disease_params = config["br"]["seir_parameters"]
+    place_specific_params = {
+        param: disease_params[param]
+        for param in [
+            "i0_percentage", "i1_percentage", "i2_percentage", "i3_percentage"
+        ]
+    }
+    place_specific_params["fatality_ratio"] = (
+        0.5 * place_specific_params["i3_percentage"]
+    )
+    return {
+        "population_params": {
+            "N": 1e6, "I": infected, "R": 2 * infected, "D": 0.02 * infected
+        },
+        "place_specific_params": place_specific_params,
+        "R0": {"best": rt, "worst": rt},
+        "n_beds": n_beds,
+        "n_icu_beds": n_icu_beds,
+    }
+
+
+def test_adaptive_answers_match_fixed_horizon(config):
+    # answers that fall within the 90 days of `run_simulation`
+    params_list = [
+        # growing: peak and both capacities exceeded within the horizon
+        _params(config, 2000, 2.5, n_beds=1000, n_icu_beds=300),
+        # declining: beds exceeded from the start, ICU after a short rise
+        _params(config, 20000, 0.8, n_beds=1000, n_icu_beds=352),
+        # declining: capacities never exceeded
+        _params(config, 20000, 0.8, n_beds=2000, n_icu_beds=400),
+    ]
+
+    summary = simulator.run_adaptive_simulation(params_list, config)
+
+    for place, params in enumerate(params_list):
+        dfs = simulator.run_simulation(params, config, model="SEAPMDR")
+        row = summary.loc[place]
+        assert (
+            row["dday_beds"] == simulator.get_dday(dfs, "I2", params["n_beds"])["best"]
+        )
+        assert (
+            row["dday_icu_beds"]
+            == simulator.get_dday(dfs, "I3", params["n_icu_beds"])["best"]
+        )
+        assert row["peak_day"] == dfs["best"][INFECTED].sum(axis=1).idxmax()
+        assert row["stop_reason"] == "answered"
+
+    assert (summary["dday_beds"] > 1).any() and (summary["dday_beds"] == -1).any()
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulacovid import metapopulation, stochastic
+from simulacovid.metapopulation import COMPARTMENTS
+
+from test_metapopulation import DISEASE_PARAMS, PLACE_PARAMS
+
+
+ACTIVE = ["I0", "I1", "I2", "I3"]
+
+# large enough for the median to follow the deterministic model
+POPULATIONS = [
+    {"N": 2e6, "I": 2000, "R": 1000, "D": 20},
+    {"N": 2e6, "I": 5000, "R": 1000, "D": 20},
+]
+
+# a growing and a declining place
+RTS = [1.3, 0.9]
+
+
+def _phase(n_days):
+    return {"scenario": "projection_current_rt", "R0": RTS, "n_days": n_days}
+
+
+def _run(seed, n_days=20, n_replicates=50, **kwargs):
+    return stochastic.entrypoint(
+        POPULATIONS,
+        [PLACE_PARAMS] * 2,
+        DISEASE_PARAMS,
+        _phase(n_days),
+        n_replicates=n_replicates,
+        seed=seed,
+        **kwargs,
+    )
+
+
+def test_same_seed_reproduces_results():
+    first, second = _run(seed=7), _run(seed=7)
+
+    pd.testing.assert_frame_equal(first["quantiles"], second["quantiles"])
+    pd.testing.assert_frame_equal(first["summary"], second["summary"])
+    assert not first["quantiles"].equals(_run(seed=8)["quantiles"])
+
+
+def test_steps_conserve_each_replicate_population():
+    y0, model_params = metapopulation.prepare_places(
+        POPULATIONS, [PLACE_PARAMS] * 2, DISEASE_PARAMS, RTS
+    )
+    y = np.repeat(np.rint(y0).astype(np.int64)[:, None, :], 20, axis=1)
+    population = y.sum(axis=0)
+    rng = np.random.default_rng(0)
+
+    for _ in range(12 * 30):
+        stochastic._step(rng, y, model_params, 1 / 12)
+
+    np.testing.assert_array_equal(y.sum(axis=0), population)
+    assert (y >= 0).all()
+    # the replicates did not all follow the same path
+    assert len(np.unique(y[COMPARTMENTS.index("D")], axis=0)) > 1
+
+
+def test_median_tracks_deterministic_model():
+    n_days = 90
+    result = _run(
+        seed=1,
+        n_days=n_days,
+        n_replicates=100,
+        steps_per_day=12,
+        compartments=tuple(ACTIVE),
+    )
+    expected = metapopulation.entrypoint(
+        POPULATIONS, [PLACE_PARAMS] * 2, DISEASE_PARAMS, _phase(n_days)
+    )
+
+    for place in range(len(POPULATIONS)):
+        median = result["quantiles"].xs((place, n_days, 0.5))[ACTIVE].sum()
+        # the bound documented for `steps_per_day`
+        np.testing.assert_allclose(
+            median, expected.loc[(place, n_days), ACTIVE].sum(), rtol=0.1
+        )
+
+
+def test_negative_initial_susceptibles_raise():
+    populations = POPULATIONS + [{"N": 1000, "I": 10, "R": 2000, "D": 0}]
+
+    with pytest.raises(ValueError, match=r"\[2\]"):
+        stochastic.entrypoint(
+            populations,
+            [PLACE_PARAMS] * 3,
+            DISEASE_PARAMS,
+            {"scenario": "projection_current_rt", "R0": RTS + [1.0], "n_days": 5},
+            n_replicates=10,
+            seed=0,
+        )